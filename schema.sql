@@ -70,6 +70,7 @@ CREATE INDEX IF NOT EXISTS idx_recording_datetime ON audio_files(recording_datet
 CREATE INDEX IF NOT EXISTS idx_audiomoth_id ON audio_files(audiomoth_id);
 CREATE INDEX IF NOT EXISTS idx_filepath ON audio_files(filepath);
 CREATE INDEX IF NOT EXISTS idx_processing_status ON audio_files(processing_status);
+CREATE INDEX IF NOT EXISTS idx_recording_date ON audio_files(date(recording_datetime));
 
 -- =============================================================================
 -- Annotations Table (Audacity labels/manual annotations)
@@ -203,6 +204,8 @@ CREATE TABLE IF NOT EXISTS weather_data (
     UNIQUE(site_id, datetime)
 );
 
+CREATE INDEX IF NOT EXISTS idx_weather_dt ON weather_data(datetime);
+
 -- =============================================================================
 -- Views
 -- =============================================================================
@@ -0,0 +1,9 @@
+"""
+Shared pytest setup: make the webapp backend modules importable
+"""
+
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'webapp' / 'v2' / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
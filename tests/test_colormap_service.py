@@ -0,0 +1,34 @@
+"""
+Tests for colormap sampling in the webapp's ColormapService
+"""
+
+import numpy as np
+import pytest
+from matplotlib import colormaps
+
+from services.colormap_service import ColormapService, load_baked_colormaps, sample_colormap
+
+
+def sample_per_index(colormap_name):
+    """The original per-index sampling loop"""
+    cmap = colormaps[colormap_name]
+    colors = []
+    for i in range(256):
+        rgba = cmap(i / 255.0)
+        colors.append([int(rgba[0] * 255), int(rgba[1] * 255), int(rgba[2] * 255)])
+    return np.array(colors, dtype=np.uint8)
+
+
+@pytest.mark.parametrize('colormap_name', ['twilight', 'viridis', 'jet'])
+def test_sample_colormap_matches_per_index_loop(colormap_name):
+    np.testing.assert_array_equal(sample_colormap(colormap_name), sample_per_index(colormap_name))
+
+
+def test_unbaked_colormap_matches_per_index_loop():
+    assert 'twilight' not in load_baked_colormaps()
+    np.testing.assert_array_equal(ColormapService.get_colormap('twilight'), sample_per_index('twilight'))
+
+
+def test_baked_colormaps_match_per_index_loop():
+    for colormap_name, lut in load_baked_colormaps().items():
+        np.testing.assert_array_equal(lut, sample_per_index(colormap_name), err_msg=colormap_name)
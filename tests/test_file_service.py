@@ -0,0 +1,60 @@
+"""
+Tests for FileService lookups against a temporary SQLite database
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+import database
+from services.file_service import FileService
+
+SCHEMA_PATH = Path(__file__).resolve().parent.parent / 'schema.sql'
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / 'audiomoth.db'
+    with sqlite3.connect(path) as conn:
+        conn.executescript(SCHEMA_PATH.read_text())
+    database.init_database(str(path), pool_size=1, max_overflow=1)
+    FileService.invalidate_cache()
+    yield path
+    database.remove_db_session()
+    database.engine.dispose()
+    FileService.invalidate_cache()
+
+
+def insert(db_path, query, params):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(query, params)
+
+
+def test_file_lookup_miss_is_not_cached(db_path):
+    assert FileService.get_file_by_datetime('2025-06-20', '00:00') is None
+    
+    insert(
+        db_path,
+        "INSERT INTO audio_files(filename, filepath, recording_datetime, duration_seconds) VALUES (?, ?, ?, ?)",
+        ('20250620_000000.WAV', '/data/20250620_000000.WAV', '2025-06-20T00:00:00', 900.0)
+    )
+    
+    file_info = FileService.get_file_by_datetime('2025-06-20', '00:00')
+    assert file_info is not None
+    assert file_info['filename'] == '20250620_000000.WAV'
+
+
+def test_weather_lookup_miss_is_not_cached(db_path):
+    assert FileService.get_weather_for_datetime('2025-06-20', '00:00') is None
+    database.remove_db_session()  # requests each get a fresh session
+    
+    insert(
+        db_path,
+        "INSERT INTO weather_data(site_id, datetime, temperature_2m) VALUES (?, ?, ?)",
+        (1, '2025-06-20 00:10:00', 12.5)
+    )
+    
+    weather = FileService.get_weather_for_datetime('2025-06-20', '00:00')
+    assert weather is not None
+    assert weather['temperature'] == 12.5
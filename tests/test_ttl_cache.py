@@ -0,0 +1,47 @@
+"""
+Tests for the webapp's TTL memoization decorator
+"""
+
+from services.ttl_cache import ttl_cache
+
+
+def test_caches_results():
+    calls = []
+    
+    @ttl_cache(ttl_seconds=60)
+    def lookup(key):
+        calls.append(key)
+        return key.upper()
+    
+    assert lookup('a') == 'A'
+    assert lookup('a') == 'A'
+    assert calls == ['a']
+
+
+def test_caches_none_by_default():
+    calls = []
+    
+    @ttl_cache(ttl_seconds=60)
+    def lookup(key):
+        calls.append(key)
+        return None
+    
+    assert lookup('a') is None
+    assert lookup('a') is None
+    assert calls == ['a']
+
+
+def test_cache_none_false_retries_misses():
+    rows = {}
+    
+    @ttl_cache(ttl_seconds=60, cache_none=False)
+    def lookup(key):
+        return rows.get(key)
+    
+    assert lookup('a') is None
+    rows['a'] = 'row'
+    assert lookup('a') == 'row'
+    
+    # Found values are still cached
+    rows['a'] = 'changed'
+    assert lookup('a') == 'row'
@@ -4,25 +4,37 @@ Files API endpoints for AudioMoth Spectrogram Viewer
 Handles file-related API requests
 """
 
-from flask import Blueprint, jsonify, request, send_file
-from typing import Dict, Any
-import io
+from flask import Blueprint, Response, current_app, jsonify, request, send_file
+from typing import Any
+import hashlib
 
+from api.serialization import fast_jsonify
+from api.validation import QueryParam, parse_query_params
 from services.file_service import FileService
 from services.poi_strips_service import POIStripsService
 
 
 files_bp = Blueprint('files', __name__)
 
+MAX_BATCH_POI_STRIPS = 100  # same cap as MAX_BULK_POI_IDS in api/poi.py
+
+SEARCH_PARAMS = (
+    QueryParam('limit', int, default=100, ge=1, le=1000),
+    QueryParam('date_from'),
+    QueryParam('date_to'),
+    QueryParam('time_from'),
+    QueryParam('time_to'),
+)
+
 
 def create_error_response(status_code: int, message: str) -> tuple:
     """Create standardized error response"""
     return jsonify({'success': False, 'error': message}), status_code
 
 
-def create_success_response(data: Any) -> Dict[str, Any]:
-    """Create standardized success response"""
-    return jsonify({'success': True, 'data': data})
+def create_success_response(data: Any) -> Response:
+    """Create standardized success response (orjson-encoded when available)"""
+    return fast_jsonify({'success': True, 'data': data})
 
 
 @files_bp.route('/api/dates')
@@ -79,29 +91,10 @@ def get_weather_data(date: str, time: str):
 def search_files():
     """Search for audio files with filters"""
     try:
-        # Validate limit parameter
-        limit_str = request.args.get('limit', '100')
-        try:
-            limit = int(limit_str)
-            if limit < 1 or limit > 1000:
-                return create_error_response(400, 'Limit must be between 1 and 1000')
-        except ValueError:
-            return create_error_response(400, 'Invalid limit parameter')
-        
-        # Get filter parameters
-        date_from = request.args.get('date_from')
-        date_to = request.args.get('date_to')
-        time_from = request.args.get('time_from')
-        time_to = request.args.get('time_to')
+        params = parse_query_params(request.args, SEARCH_PARAMS)
         
         # Search files
-        files = FileService.search_files(
-            date_from=date_from,
-            date_to=date_to,
-            time_from=time_from,
-            time_to=time_to,
-            limit=limit
-        )
+        files = FileService.search_files(**params)
         
         return create_success_response(files)
         
@@ -125,9 +118,9 @@ def get_navigation_file():
         if direction not in ['next', 'prev']:
             return create_error_response(400, "Direction must be 'next' or 'prev'")
         
-        print(f"Navigation API: date={date}, time={time}, direction={direction}")
+        current_app.logger.debug("Navigation API: date=%s, time=%s, direction=%s", date, time, direction)
         file_info = FileService.get_navigation_file(date, time, direction)
-        print(f"Navigation API: Got result: {file_info}")
+        current_app.logger.debug("Navigation API: got result %s", file_info)
         
         if not file_info:
             return create_error_response(404, f'No {direction} file found')
@@ -154,7 +147,7 @@ def get_available_times():
             times = [file['time'] for file in files]
             data[date_str] = sorted(times)
         
-        return jsonify(data)
+        return fast_jsonify(data)
         
     except Exception as e:
         return create_error_response(500, f"Failed to get available times: {str(e)}")
@@ -204,29 +197,79 @@ def get_file_pois(date: str, time: str):
         return create_error_response(500, f"Failed to get POIs for file: {str(e)}")
 
 
+@files_bp.route('/api/poi-strips/batch')
+def get_poi_strips_batch():
+    """Get POI strips for several files (?files=DATE/TIME,...) as one binary body
+    
+    The body is the PNGs concatenated in X-Strip-Files order; X-Strip-Lengths gives
+    each PNG's byte length (0 when the file has no spectrogram) and X-Strip-Counts
+    the strips drawn in it (0 for an empty placeholder).
+    """
+    files = list(dict.fromkeys(
+        file.strip() for file in request.args.get('files', '').split(',') if file.strip()
+    ))
+    if not files:
+        return create_error_response(400, 'files is required')
+    if len(files) > MAX_BATCH_POI_STRIPS:
+        return create_error_response(400, f'At most {MAX_BATCH_POI_STRIPS} files per request')
+    
+    pairs = [tuple(file.split('/', 1)) for file in files]
+    if any(len(pair) != 2 for pair in pairs):
+        return create_error_response(400, 'files must be a comma-separated list of DATE/TIME')
+    
+    try:
+        colormap = request.args.get('colormap', 'viridis')
+        compact = request.args.get('compact') == '1'
+        
+        # Render concurrently; missing files get a zero length
+        images = POIStripsService.generate_many(pairs, colormap, compact)
+        pngs = [b'' if image is None else image[0].getvalue() for image in images]
+        counts = [0 if image is None else image[1] for image in images]
+        body = b''.join(pngs)
+        
+        response = Response(body, mimetype='application/octet-stream')
+        response.headers['X-Strip-Files'] = ','.join(files)
+        response.headers['X-Strip-Lengths'] = ','.join(str(len(png)) for png in pngs)
+        response.headers['X-Strip-Counts'] = ','.join(map(str, counts))
+        if compact:
+            response.headers['X-Strip-Pitch'] = str(POIStripsService.STRIP_PITCH)
+        # POIs change, so revalidate every time (like the single-strip route) via the ETag
+        response.cache_control.no_cache = True
+        response.set_etag(hashlib.md5(body).hexdigest())
+        
+        return response.make_conditional(request)
+        
+    except Exception as e:
+        return create_error_response(500, f"Failed to get POI strips: {str(e)}")
+
+
 @files_bp.route('/api/poi-strips/<date>/<time>')
 def get_poi_strips_png(date: str, time: str):
     """Get POI strips as PNG image matching spectrogram dimensions"""
     try:
         # Get query parameters
         colormap = request.args.get('colormap', 'viridis')
+        compact = request.args.get('compact') == '1'
         
         # Generate POI strips PNG
-        image_data = POIStripsService.generate_poi_strips_png(date, time, colormap)
+        image = POIStripsService.generate_poi_strips_png(date, time, colormap, compact)
         
-        if not image_data:
+        if image is None:
             return create_error_response(404, f'No POI strips found for {date} {time}')
+        image_io, strip_count = image
         
-        # Create file-like object and serve
-        image_io = io.BytesIO(image_data)
-        image_io.seek(0)
-        
-        return send_file(
+        # The service returns a rewound buffer, served without copying it again
+        response = send_file(
             image_io,
             mimetype='image/png',
             as_attachment=False,
             download_name=f'poi_strips_{date}_{time}.png'
         )
+        if compact and strip_count:
+            # Display height of each encoded row, for clients scaling the compact image;
+            # omitted for the empty placeholder, which must not be scaled
+            response.headers['X-Strip-Pitch'] = str(POIStripsService.STRIP_PITCH)
+        return response
         
     except ValueError as e:
         return create_error_response(400, str(e))
@@ -4,13 +4,54 @@ Acoustic Indices API endpoints for AudioMoth Spectrogram Viewer
 Handles acoustic indices data requests and RGB mapping
 """
 
-from flask import Blueprint, request, jsonify, current_app
-from typing import Dict, List, Optional, Any
+from flask import Blueprint, Response, request, jsonify, current_app, g, stream_with_context
+from typing import Dict, Iterator, List, Optional, Any
 import sqlite3
 import os
 
+import numpy as np
+
+from database import configure_sqlite_connection
+from api.serialization import dumps, fast_jsonify
+from services.file_service import recording_datetime_range
+from services.ttl_cache import ttl_cache
+
 indices_bp = Blueprint('indices', __name__)
 
+# SQL kept as constants so each request reuses the connection's prepared statements
+SQL_FILE_BY_DATETIME = """
+    SELECT id, filename, filepath, duration_seconds
+    FROM audio_files 
+    WHERE recording_datetime >= ? 
+    AND recording_datetime < ?
+"""
+
+SQL_AVAILABLE_INDICES = """
+    SELECT DISTINCT index_name 
+    FROM v_acoustic_indices 
+    ORDER BY index_name
+"""
+
+SQL_FILE_INDICES = """
+    SELECT index_name, chunk_index, start_time_sec, value
+    FROM v_acoustic_indices
+    WHERE file_id = ?
+    ORDER BY index_name, chunk_index
+"""
+
+# Keyed by number of requested channels (1-3)
+SQL_RGB_INDICES = {
+    count: f"""
+    SELECT index_name, chunk_index, start_time_sec, value
+    FROM v_acoustic_indices
+    WHERE file_id = ? AND index_name IN ({','.join('?' * count)})
+    ORDER BY chunk_index, index_name
+"""
+    for count in (1, 2, 3)
+}
+
+STATEMENT_CACHE_SIZE = 256
+
 
 def create_error_response(status_code: int, message: str) -> tuple:
     """Create standardized error response"""
@@ -18,37 +59,39 @@ def create_error_response(status_code: int, message: str) -> tuple:
 
 
 def get_db_connection() -> sqlite3.Connection:
-    """Get database connection using app config"""
-    db_path = current_app.config.get('DATABASE_PATH')
-    if not db_path or not os.path.exists(db_path):
-        raise RuntimeError(f"Database not found at: {db_path}")
+    """Get this request's database connection using app config (closed on teardown)"""
+    if 'indices_db' not in g:
+        db_path = current_app.config.get('DATABASE_PATH')
+        if not db_path or not os.path.exists(db_path):
+            raise RuntimeError(f"Database not found at: {db_path}")
+        
+        conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.row_factory = sqlite3.Row
+        configure_sqlite_connection(conn)
+        g.indices_db = conn
     
-    conn = sqlite3.connect(db_path)
-    conn.row_factory = sqlite3.Row
-    return conn
+    return g.indices_db
+
+
+@indices_bp.teardown_app_request
+def close_db_connection(exception: Optional[BaseException]) -> None:
+    """Close the request's database connection if one was opened"""
+    conn = g.pop('indices_db', None)
+    if conn is not None:
+        conn.close()
 
 
 def get_file_by_datetime(date: str, time: str) -> Optional[Dict[str, Any]]:
     """Get audio file info by date and time"""
     try:
+        start, end = recording_datetime_range(date, time)
+        
         conn = get_db_connection()
         cursor = conn.cursor()
         
-        # Format time with seconds if not provided (HH:MM -> HH:MM:SS)
-        if len(time) == 5:  # HH:MM format
-            time_formatted = f"{time}:00"
-        else:
-            time_formatted = time
-        
-        cursor.execute("""
-            SELECT id, filename, filepath, duration_seconds
-            FROM audio_files 
-            WHERE DATE(recording_datetime) = ? 
-            AND TIME(recording_datetime) = ?
-        """, (date, time_formatted))
+        cursor.execute(SQL_FILE_BY_DATETIME, (start, end))
         
         row = cursor.fetchone()
-        conn.close()
         
         if row:
             return {
@@ -64,23 +107,60 @@ def get_file_by_datetime(date: str, time: str) -> Optional[Dict[str, Any]]:
         return None
 
 
+@ttl_cache(ttl_seconds=60)
+def fetch_available_indices() -> List[str]:
+    """Query distinct index names (cached; only changes when indices are ingested)"""
+    cursor = get_db_connection().cursor()
+    cursor.row_factory = None  # plain tuples; only one column is read
+    cursor.arraysize = 1000
+    cursor.execute(SQL_AVAILABLE_INDICES)
+    
+    indices = []
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            return indices
+        indices.extend(row[0] for row in rows)
+
+
+def generate_indices_json(cursor: sqlite3.Cursor, file_info: Dict[str, Any]) -> Iterator[bytes]:
+    """Stream the file indices response, grouping rows ordered by index_name"""
+    yield b'{"success":true,"data":{"file_info":' + dumps(file_info) + b',"indices":{'
+    
+    current_index = None
+    while True:
+        rows = cursor.fetchmany()
+        if not rows:
+            break
+        
+        parts = []
+        for index_name, chunk_index, start_time_sec, value in rows:
+            entry = dumps({
+                'chunk_index': chunk_index,
+                'start_time_sec': start_time_sec,
+                'value': value
+            })
+            if index_name == current_index:
+                parts.append(b',' + entry)
+                continue
+            
+            # Close the previous index's array and open the next one
+            if current_index is not None:
+                parts.append(b'],')
+            parts.append(dumps(index_name) + b':[' + entry)
+            current_index = index_name
+        yield b''.join(parts)
+    
+    yield (b']' if current_index is not None else b'') + b'}}}'
+
+
 @indices_bp.route('/api/indices/available')
 def get_available_indices():
     """Get list of all available acoustic index types"""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT DISTINCT index_name 
-            FROM v_acoustic_indices 
-            ORDER BY index_name
-        """)
-        
-        indices = [row['index_name'] for row in cursor.fetchall()]
-        conn.close()
+        indices = fetch_available_indices()
         
-        return jsonify({
+        return fast_jsonify({
             'success': True,
             'data': indices
         })
@@ -100,37 +180,21 @@ def get_file_indices(date: str, time: str):
         
         conn = get_db_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples, unpacked positionally below
+        cursor.arraysize = 1000
         
-        cursor.execute("""
-            SELECT index_name, chunk_index, start_time_sec, value
-            FROM v_acoustic_indices
-            WHERE file_id = ?
-            ORDER BY index_name, chunk_index
-        """, (file_info['id'],))
-        
-        rows = cursor.fetchall()
-        conn.close()
-        
-        # Group data by index name
-        indices_data = {}
-        for row in rows:
-            index_name = row['index_name']
-            if index_name not in indices_data:
-                indices_data[index_name] = []
-            
-            indices_data[index_name].append({
-                'chunk_index': row['chunk_index'],
-                'start_time_sec': row['start_time_sec'],
-                'value': row['value']
-            })
+        cursor.execute(SQL_FILE_INDICES, (file_info['id'],))
         
-        return jsonify({
-            'success': True,
-            'data': {
-                'file_info': file_info,
-                'indices': indices_data
-            }
-        })
+        # Stream rows grouped by index name instead of building the whole payload.
+        # The body outlives request teardown, so the response takes over the connection
+        # and closes it when the server closes the body, even if it was never iterated.
+        g.pop('indices_db')
+        response = Response(
+            stream_with_context(generate_indices_json(cursor, file_info)),
+            mimetype='application/json'
+        )
+        response.call_on_close(conn.close)
+        return response
         
     except Exception as e:
         return create_error_response(500, f"Failed to get indices data: {str(e)}")
@@ -138,7 +202,7 @@ def get_file_indices(date: str, time: str):
 
 @indices_bp.route('/api/indices/<date>/<time>/rgb')
 def get_rgb_indices(date: str, time: str):
-    """Get RGB-mapped indices data for visualization"""
+    """Get RGB-mapped indices data for visualization (?format=binary for packed arrays)"""
     try:
         # Get query parameters for RGB channel assignments
         red_index = request.args.get('red')
@@ -155,34 +219,24 @@ def get_rgb_indices(date: str, time: str):
         
         conn = get_db_connection()
         cursor = conn.cursor()
+        cursor.row_factory = None  # plain tuples, unpacked positionally below
         
         # Build query for requested indices
         requested_indices = [idx for idx in [red_index, green_index, blue_index] if idx]
-        placeholders = ','.join(['?' for _ in requested_indices])
         
-        cursor.execute(f"""
-            SELECT index_name, chunk_index, start_time_sec, value
-            FROM v_acoustic_indices
-            WHERE file_id = ? AND index_name IN ({placeholders})
-            ORDER BY chunk_index, index_name
-        """, [file_info['id']] + requested_indices)
+        cursor.execute(SQL_RGB_INDICES[len(requested_indices)], [file_info['id']] + requested_indices)
         
         rows = cursor.fetchall()
-        conn.close()
         
         # Group by chunk_index and organize RGB data
         chunks_data = {}
         indices_ranges = {}
         
         # First pass: collect all data and calculate ranges for normalization
-        for row in rows:
-            chunk_idx = row['chunk_index']
-            index_name = row['index_name']
-            value = row['value']
-            
+        for index_name, chunk_idx, start_time_sec, value in rows:
             if chunk_idx not in chunks_data:
                 chunks_data[chunk_idx] = {
-                    'start_time_sec': row['start_time_sec'],
+                    'start_time_sec': start_time_sec,
                     'values': {}
                 }
             
@@ -195,50 +249,54 @@ def get_rgb_indices(date: str, time: str):
                 indices_ranges[index_name]['min'] = min(indices_ranges[index_name]['min'], value)
                 indices_ranges[index_name]['max'] = max(indices_ranges[index_name]['max'], value)
         
-        # Second pass: normalize to 0-255 and create RGB array
-        rgb_data = []
-        for chunk_idx in sorted(chunks_data.keys()):
-            chunk = chunks_data[chunk_idx]
-            
-            # Normalize each channel to 0-255
-            r = g = b = 0
-            
-            if red_index and red_index in chunk['values']:
-                range_info = indices_ranges[red_index]
-                if range_info['max'] > range_info['min']:
-                    r = int(255 * (chunk['values'][red_index] - range_info['min']) / 
-                           (range_info['max'] - range_info['min']))
-                else:
-                    r = 128  # Default to mid-range if no variation
-            
-            if green_index and green_index in chunk['values']:
-                range_info = indices_ranges[green_index]
-                if range_info['max'] > range_info['min']:
-                    g = int(255 * (chunk['values'][green_index] - range_info['min']) / 
-                           (range_info['max'] - range_info['min']))
-                else:
-                    g = 128
-            
-            if blue_index and blue_index in chunk['values']:
-                range_info = indices_ranges[blue_index]
-                if range_info['max'] > range_info['min']:
-                    b = int(255 * (chunk['values'][blue_index] - range_info['min']) / 
-                           (range_info['max'] - range_info['min']))
-                else:
-                    b = 128
+        # Second pass: normalize each channel to 0-255 in one vectorized step
+        channels = [red_index, green_index, blue_index]
+        chunk_indices = sorted(chunks_data.keys())
+        start_times = np.array(
+            [chunks_data[chunk_idx]['start_time_sec'] for chunk_idx in chunk_indices],
+            dtype=np.float64
+        )
+        rgb = np.zeros((len(chunk_indices), 3), dtype=np.uint8)
+        
+        for channel, index_name in enumerate(channels):
+            if not index_name or index_name not in indices_ranges:
+                continue
             
-            rgb_data.append({
+            values = np.array(
+                [chunks_data[chunk_idx]['values'].get(index_name, np.nan) for chunk_idx in chunk_indices],
+                dtype=np.float64
+            )
+            present = ~np.isnan(values)
+            range_info = indices_ranges[index_name]
+            if range_info['max'] > range_info['min']:
+                scaled = 255 * (values[present] - range_info['min']) / (range_info['max'] - range_info['min'])
+                rgb[present, channel] = scaled.astype(np.uint8)
+            else:
+                rgb[present, channel] = 128  # Default to mid-range if no variation
+        
+        if request.args.get('format') == 'binary':
+            # Packed layout: N little-endian float32 start times, then N x 3 uint8 RGB
+            body = start_times.astype('<f4').tobytes() + rgb.tobytes()
+            return Response(body, mimetype='application/octet-stream', headers={
+                'X-Chunks': str(len(chunk_indices)),
+                'X-Indices': ','.join(index_name or '' for index_name in channels)
+            })
+        
+        rgb_data = [
+            {
                 'chunk_index': chunk_idx,
-                'start_time_sec': chunk['start_time_sec'],
-                'rgb': [r, g, b],
+                'start_time_sec': chunks_data[chunk_idx]['start_time_sec'],
+                'rgb': chunk_rgb,
                 'raw_values': {
-                    'red': chunk['values'].get(red_index) if red_index else None,
-                    'green': chunk['values'].get(green_index) if green_index else None,
-                    'blue': chunk['values'].get(blue_index) if blue_index else None
+                    'red': chunks_data[chunk_idx]['values'].get(red_index) if red_index else None,
+                    'green': chunks_data[chunk_idx]['values'].get(green_index) if green_index else None,
+                    'blue': chunks_data[chunk_idx]['values'].get(blue_index) if blue_index else None
                 }
-            })
+            }
+            for chunk_idx, chunk_rgb in zip(chunk_indices, rgb.tolist())
+        ]
         
-        return jsonify({
+        return fast_jsonify({
             'success': True,
             'data': {
                 'file_info': file_info,
@@ -4,12 +4,45 @@ POI API endpoints for AudioMoth Spectrogram Viewer
 Handles Points of Interest browsing and deep linking
 """
 
-from flask import Blueprint, render_template, request, jsonify
+from flask import Blueprint, abort, current_app, render_template, request, jsonify
 from datetime import datetime
 from database import execute_raw_query
+from api.validation import QueryParam, parse_query_params
 
 poi_bp = Blueprint('poi', __name__, url_prefix='/poi')
 
+# Span rows aliased to their response keys so each row maps straight to a dict
+SPANS_COLUMNS = """
+    ps.id, ps.start_time_sec, ps.end_time_sec, ps.chunk_start, ps.chunk_end,
+    ps.config_name, ps.processing_type, ps.created_at,
+    af.id AS file_id, af.filename AS file_name, af.filepath AS file_path,
+    af.recording_datetime AS datetime_recorded
+"""
+
+SPANS_QUERY = f"""
+SELECT {SPANS_COLUMNS}
+FROM poi_spans ps
+JOIN audio_files af ON ps.file_id = af.id
+WHERE ps.poi_id = ?
+ORDER BY af.recording_datetime, ps.start_time_sec
+"""
+
+# Formatted with one placeholder per requested POI id
+BULK_SPANS_QUERY = """
+SELECT ps.poi_id, {columns}
+FROM poi_spans ps
+JOIN audio_files af ON ps.file_id = af.id
+WHERE ps.poi_id IN ({placeholders})
+ORDER BY ps.poi_id, af.recording_datetime, ps.start_time_sec
+"""
+
+MAX_BULK_POI_IDS = 100
+
+POI_PAGE_PARAMS = (
+    QueryParam('page', int, default=1, ge=1),
+    QueryParam('per_page', int, default=20, ge=1, le=100),
+)
+
 
 @poi_bp.route('/test')
 def test_route():
@@ -25,109 +58,94 @@ def format_time_seconds(seconds):
     return f"{hours:02d}:{minutes:02d}:{secs:02d}"
 
 
+def format_span(span):
+    """Add HH:MM:SS renderings of a span's start and end times"""
+    span['start_time_formatted'] = format_time_seconds(span['start_time_sec'])
+    span['end_time_formatted'] = format_time_seconds(span['end_time_sec'])
+    return span
+
+
 @poi_bp.route('/')
 def poi_page():
-    """Main POI browsing page"""
+    """Main POI browsing page, paginated by goal (spans load on demand)"""
     try:
-        # Get all research goals with their POIs
+        params = parse_query_params(request.args, POI_PAGE_PARAMS)
+    except ValueError as e:
+        abort(400, description=str(e))
+    page, per_page = params['page'], params['per_page']
+    
+    try:
+        # Fetch one extra goal to know whether a next page exists
         goals_query = """
         SELECT 
             id, title, description, created_at
         FROM research_goals 
         ORDER BY created_at DESC
+        LIMIT ? OFFSET ?
         """
-        goals_data = execute_raw_query(goals_query)
-        print(f"Debug: Found {len(goals_data)} goals in database")
+        goals_data = execute_raw_query(goals_query, (per_page + 1, (page - 1) * per_page))
+        has_next = len(goals_data) > per_page
+        goals_data = goals_data[:per_page]
+        current_app.logger.debug("POI page %d: found %d goals", page, len(goals_data))
         
         goals = []
-        for goal_row in goals_data:
-            print(f"Debug: Processing goal row: {goal_row}")
-            
+        for goal_row in map(dict, goals_data):
             # Parse created_at safely
             created_at = None
-            if len(goal_row) > 3 and goal_row[3]:
+            if goal_row['created_at']:
                 try:
-                    dt_str = str(goal_row[3])
+                    dt_str = str(goal_row['created_at'])
                     if 'T' in dt_str:
                         created_at = datetime.fromisoformat(dt_str.replace('T', ' '))
                     else:
                         created_at = datetime.fromisoformat(dt_str)
                 except Exception as e:
-                    print(f"Debug: Error parsing datetime '{goal_row[3]}': {e}")
+                    current_app.logger.debug("POI page: could not parse created_at %r: %s", goal_row['created_at'], e)
                     created_at = None
                 
-            goal = {
-                'id': goal_row[0],
-                'title': goal_row[1],
-                'description': goal_row[2] if len(goal_row) > 2 else '',
+            goals.append({
+                'id': goal_row['id'],
+                'title': goal_row['title'],
+                'description': goal_row['description'] or '',
                 'created_at': created_at,
                 'pois': []
-            }
-            
-            # Get POIs for this goal
+            })
+        
+        # Get POIs for all goals on this page in one query
+        if goals:
             try:
-                pois_query = """
+                goals_by_id = {goal['id']: goal for goal in goals}
+                placeholders = ','.join('?' for _ in goals_by_id)
+                pois_query = f"""
                 SELECT 
-                    p.id, p.label, p.notes, p.confidence, p.anchor_index_name, p.created_at
+                    p.id, p.goal_id, p.label, p.notes, p.confidence, p.anchor_index_name,
+                    COUNT(ps.id) as span_count
                 FROM points_of_interest p
-                WHERE p.goal_id = ?
+                LEFT JOIN poi_spans ps ON ps.poi_id = p.id
+                WHERE p.goal_id IN ({placeholders})
+                GROUP BY p.id
                 ORDER BY p.created_at DESC
                 """
-                pois_data = execute_raw_query(pois_query, (goal['id'],))
+                pois_data = execute_raw_query(pois_query, tuple(goals_by_id))
                 
-                for poi_row in pois_data:
-                    poi = {
-                        'id': poi_row[0],
-                        'label': poi_row[1],
-                        'notes': poi_row[2] if poi_row[2] else '',
-                        'confidence': poi_row[3] if poi_row[3] else 0.0,
-                        'anchor_index_name': poi_row[4] if poi_row[4] else '',
-                        'spans': []
-                    }
-                    
-                    # Get spans for this POI
-                    try:
-                        spans_query = """
-                        SELECT 
-                            ps.id, ps.start_time_sec, ps.end_time_sec, ps.chunk_start, ps.chunk_end,
-                            ps.config_name, ps.processing_type, ps.created_at,
-                            af.id, af.filename, af.filepath, af.recording_datetime
-                        FROM poi_spans ps
-                        JOIN audio_files af ON ps.file_id = af.id
-                        WHERE ps.poi_id = ?
-                        ORDER BY af.recording_datetime, ps.start_time_sec
-                        """
-                        spans_data = execute_raw_query(spans_query, (poi['id'],))
-                        
-                        for span_row in spans_data:
-                            span = {
-                                'id': span_row[0],
-                                'file_id': span_row[8],  # af.id (file_id from JOIN)
-                                'file_name': span_row[9],  # af.filename  
-                                'start_time_sec': span_row[1],
-                                'end_time_sec': span_row[2],
-                                'start_time_formatted': format_time_seconds(span_row[1]),
-                                'end_time_formatted': format_time_seconds(span_row[2]),
-                            }
-                            poi['spans'].append(span)
-                    except Exception as e:
-                        print(f"Debug: Error loading spans for POI {poi['id']}: {e}")
-                    
-                    goal['pois'].append(poi)
-                    
+                for poi_row in map(dict, pois_data):
+                    goals_by_id[poi_row['goal_id']]['pois'].append({
+                        'id': poi_row['id'],
+                        'label': poi_row['label'],
+                        'notes': poi_row['notes'] or '',
+                        'confidence': poi_row['confidence'] or 0.0,
+                        'anchor_index_name': poi_row['anchor_index_name'] or '',
+                        'span_count': poi_row['span_count']
+                    })
             except Exception as e:
-                print(f"Debug: Error loading POIs for goal {goal['id']}: {e}")
-            
-            goals.append(goal)
+                current_app.logger.warning("POI page: error loading POIs: %s", e)
         
-        print(f"Debug: Returning {len(goals)} goals to template")
-        return render_template('poi.html', goals=goals)
+        current_app.logger.debug("POI page %d: rendering %d goals", page, len(goals))
+        return render_template('poi.html', goals=goals, page=page, per_page=per_page, has_next=has_next)
         
     except Exception as e:
-        print(f"Error loading POI page: {e}")
-        import traceback
-        traceback.print_exc()
-        return render_template('poi.html', goals=[])
+        current_app.logger.exception("Error loading POI page: %s", e)
+        return render_template('poi.html', goals=[], page=page, per_page=per_page, has_next=False)
 
 
 @poi_bp.route('/api/goals')
@@ -136,23 +154,15 @@ def api_goals():
     try:
         goals_query = """
         SELECT 
-            id, title, description, created_at,
-            (SELECT COUNT(*) FROM points_of_interest WHERE goal_id = research_goals.id) as poi_count
-        FROM research_goals 
-        ORDER BY created_at DESC
+            g.id, g.title, g.description, g.created_at,
+            COUNT(p.id) as poi_count
+        FROM research_goals g
+        LEFT JOIN points_of_interest p ON p.goal_id = g.id
+        GROUP BY g.id
+        ORDER BY g.created_at DESC
         """
         goals_data = execute_raw_query(goals_query)
-        
-        goals = []
-        for row in goals_data:
-            goal = {
-                'id': row[0],  # id
-                'title': row[1],  # title
-                'description': row[2],  # description
-                'created_at': row[3],  # created_at
-                'poi_count': row[4]  # poi_count
-            }
-            goals.append(goal)
+        goals = [dict(row) for row in goals_data]
         
         return jsonify(goals)
         
@@ -167,25 +177,15 @@ def api_goal_pois(goal_id):
         pois_query = """
         SELECT 
             p.id, p.label, p.notes, p.confidence, p.anchor_index_name, p.created_at,
-            (SELECT COUNT(*) FROM poi_spans WHERE poi_id = p.id) as span_count
+            COUNT(ps.id) as span_count
         FROM points_of_interest p
+        LEFT JOIN poi_spans ps ON ps.poi_id = p.id
         WHERE p.goal_id = ?
+        GROUP BY p.id
         ORDER BY p.created_at DESC
         """
         pois_data = execute_raw_query(pois_query, (goal_id,))
-        
-        pois = []
-        for row in pois_data:
-            poi = {
-                'id': row[0],  # id
-                'label': row[1],  # label
-                'notes': row[2],  # notes
-                'confidence': row[3],  # confidence
-                'anchor_index_name': row[4],  # anchor_index_name
-                'created_at': row[5],  # created_at
-                'span_count': row[6]  # span_count
-            }
-            pois.append(poi)
+        pois = [dict(row) for row in pois_data]
         
         return jsonify(pois)
         
@@ -197,39 +197,41 @@ def api_goal_pois(goal_id):
 def api_poi_spans(poi_id):
     """API endpoint for spans of a specific POI"""
     try:
-        spans_query = """
-        SELECT 
-            ps.id, ps.start_time_sec, ps.end_time_sec, ps.chunk_start, ps.chunk_end,
-            ps.config_name, ps.processing_type, ps.created_at,
-            af.id as file_id, af.filename, af.filepath, af.recording_datetime
-        FROM poi_spans ps
-        JOIN audio_files af ON ps.file_id = af.id
-        WHERE ps.poi_id = ?
-        ORDER BY af.recording_datetime, ps.start_time_sec
-        """
-        spans_data = execute_raw_query(spans_query, (poi_id,))
-        
-        spans = []
-        for row in spans_data:
-            span = {
-                'id': row[0],  # ps.id
-                'file_id': row[8],  # af.id
-                'file_name': row[9],  # af.filename
-                'file_path': row[10],  # af.filepath
-                'start_time_sec': row[1],  # ps.start_time_sec
-                'end_time_sec': row[2],  # ps.end_time_sec
-                'start_time_formatted': format_time_seconds(row[1]),  # ps.start_time_sec
-                'end_time_formatted': format_time_seconds(row[2]),  # ps.end_time_sec
-                'chunk_start': row[3],  # ps.chunk_start
-                'chunk_end': row[4],  # ps.chunk_end
-                'config_name': row[5],  # ps.config_name
-                'processing_type': row[6],  # ps.processing_type
-                'created_at': row[7],  # ps.created_at
-                'datetime_recorded': row[11]  # af.recording_datetime
-            }
-            spans.append(span)
+        spans_data = execute_raw_query(SPANS_QUERY, (poi_id,))
+        spans = [format_span(dict(span)) for span in spans_data]
         
         return jsonify(spans)
         
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+@poi_bp.route('/api/spans')
+def api_bulk_poi_spans():
+    """API endpoint for spans of several POIs (?poi_ids=1,2,3), keyed by POI id"""
+    try:
+        poi_ids = list(dict.fromkeys(
+            int(poi_id) for poi_id in request.args.get('poi_ids', '').split(',') if poi_id.strip()
+        ))
+    except ValueError:
+        return jsonify({'error': 'poi_ids must be a comma-separated list of integers'}), 400
+    
+    if not poi_ids:
+        return jsonify({'error': 'poi_ids is required'}), 400
+    if len(poi_ids) > MAX_BULK_POI_IDS:
+        return jsonify({'error': f'At most {MAX_BULK_POI_IDS} poi_ids per request'}), 400
+    
+    try:
+        query = BULK_SPANS_QUERY.format(
+            columns=SPANS_COLUMNS,
+            placeholders=','.join('?' * len(poi_ids))
+        )
+        spans_by_poi = {poi_id: [] for poi_id in poi_ids}
+        for row in execute_raw_query(query, poi_ids):
+            span = dict(row)
+            spans_by_poi[span.pop('poi_id')].append(format_span(span))
+        
+        return jsonify(spans_by_poi)
+        
     except Exception as e:
         return jsonify({'error': str(e)}), 500
\ No newline at end of file
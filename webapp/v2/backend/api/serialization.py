@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+JSON serialization helpers for AudioMoth Spectrogram Viewer
+Uses orjson for large responses when available, falling back to Flask's jsonify
+"""
+
+import json
+from typing import Any
+
+from flask import Response, jsonify
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def fast_jsonify(obj: Any, status: int = 200) -> Response:
+    """Serialize obj to a JSON response, using orjson's C encoder if installed"""
+    if not ORJSON_AVAILABLE:
+        response = jsonify(obj)
+        response.status_code = status
+        return response
+    
+    return Response(
+        orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        mimetype='application/json'
+    )
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode obj as JSON bytes (for responses whose body is cached)"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode('utf-8')
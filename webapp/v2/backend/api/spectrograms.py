@@ -4,58 +4,90 @@ Spectrograms API endpoints for AudioMoth Spectrogram Viewer
 Handles spectrogram image requests and processing
 """
 
-from flask import Blueprint, request, send_file, jsonify
-import io
+from flask import Blueprint, Response, request, jsonify, send_file
+from functools import lru_cache
+from typing import Optional
+import hashlib
 
+from api.serialization import dumps, fast_jsonify
+from api.validation import QueryParam, parse_query_params
 from services.spectrogram_service import SpectrogramService
 from services.colormap_service import ColormapService
 
 
 spectrograms_bp = Blueprint('spectrograms', __name__)
 
+SPECTROGRAM_PARAMS = (
+    QueryParam('colormap', default='viridis'),
+    QueryParam('gamma', float, default=1.0, gt=0, le=10),
+)
+
+MEL_SCALE_PARAMS = (
+    QueryParam('sample_rate', int, default=48000, gt=0, le=192000),
+    QueryParam('n_mels', int, default=128, gt=0, le=1024),
+    QueryParam('fmin', float, default=0.0, ge=0),
+    QueryParam('fmax', float),
+)
+
 
 def create_error_response(status_code: int, message: str) -> tuple:
     """Create standardized error response"""
     return jsonify({'success': False, 'error': message}), status_code
 
 
+@lru_cache(maxsize=128)
+def get_mel_scale_json(sample_rate: int, n_mels: int, fmin: float, fmax: Optional[float]) -> bytes:
+    """Serialized mel scale data, cached so repeat requests skip computation and encoding"""
+    return dumps(ColormapService.get_mel_scale_data(sample_rate, n_mels, fmin, fmax))
+
+
 @spectrograms_bp.route('/api/spectrogram/<date>/<time>')
 def get_spectrogram(date: str, time: str):
     """Get spectrogram image with optional colormap and gamma correction"""
     try:
-        # Get query parameters
-        colormap = request.args.get('colormap', 'viridis')
-        gamma_str = request.args.get('gamma', '1.0')
+        params = parse_query_params(request.args, SPECTROGRAM_PARAMS)
         
-        # Validate gamma parameter
-        try:
-            gamma = float(gamma_str)
-            if gamma <= 0 or gamma > 10:
-                return create_error_response(400, 'Gamma must be between 0 and 10')
-        except ValueError:
-            return create_error_response(400, 'Invalid gamma parameter')
+        if params['colormap'] == 'grayscale' and params['gamma'] == 1.0:
+            # Unprocessed: send the file from disk without reading it into Python
+            image_path = SpectrogramService.get_spectrogram_path(date, time)
+            if not image_path:
+                return create_error_response(404, f'No spectrogram found for {date} {time}')
+            
+            response = send_file(
+                image_path,
+                mimetype='image/png',
+                as_attachment=False,
+                download_name=f'spectrogram_{date}_{time}.png',
+                max_age=3600
+            )
+            response.headers['X-Colormap-Applied'] = 'none'
+            return response
         
         # Get processed spectrogram image
-        image_data = SpectrogramService.get_spectrogram_with_processing(
-            date, time, colormap, gamma
+        processed = SpectrogramService.get_spectrogram_with_processing(
+            date, time, params['colormap'], params['gamma']
         )
         
-        if not image_data:
+        if not processed:
             return create_error_response(404, f'No spectrogram found for {date} {time}')
+        image_data, applied_colormap = processed
         
-        # Create file-like object and serve
-        image_io = io.BytesIO(image_data)
-        image_io.seek(0)
+        # Serve the bytes directly; wrapping them in BytesIO only adds a copy
+        response = Response(image_data, mimetype='image/png')
+        response.headers['Content-Disposition'] = f'inline; filename="spectrogram_{date}_{time}.png"'
+        response.headers['Cache-Control'] = 'public, max-age=3600'
+        # Color sources (e.g. ACI overlays) keep their own colors; tell clients the colormap was not used
+        response.headers['X-Colormap-Applied'] = applied_colormap
+        response.set_etag(hashlib.md5(image_data).hexdigest())
         
-        return send_file(
-            image_io,
-            mimetype='image/png',
-            as_attachment=False,
-            download_name=f'spectrogram_{date}_{time}.png'
-        )
+        return response.make_conditional(request)
         
     except ValueError as e:
         return create_error_response(400, str(e))
+    except FileNotFoundError:
+        # Removed since its path was cached
+        SpectrogramService.resolve_spectrogram_file.cache_clear()
+        return create_error_response(404, f'No spectrogram found for {date} {time}')
     except Exception as e:
         return create_error_response(500, f"Failed to get spectrogram: {str(e)}")
 
@@ -73,7 +105,7 @@ def get_colormap(colormap_name: str):
             else:
                 return create_error_response(404, f'Unknown colormap: {colormap_name}')
         
-        return jsonify(colormap_data)
+        return fast_jsonify(colormap_data.tolist())
         
     except Exception as e:
         return create_error_response(500, f"Failed to get colormap: {str(e)}")
@@ -93,29 +125,18 @@ def get_available_colormaps():
 def get_mel_scale():
     """Get mel scale frequency mapping for spectrograms"""
     try:
-        # Get query parameters with defaults
-        sample_rate = int(request.args.get('sample_rate', 48000))
-        n_mels = int(request.args.get('n_mels', 128))
-        fmin = float(request.args.get('fmin', 0))
-        fmax_str = request.args.get('fmax')
-        fmax = float(fmax_str) if fmax_str else None
-        
-        # Validate parameters
-        if sample_rate <= 0 or sample_rate > 192000:
-            return create_error_response(400, 'Invalid sample rate')
-        if n_mels <= 0 or n_mels > 1024:
-            return create_error_response(400, 'Invalid n_mels')
-        if fmin < 0:
-            return create_error_response(400, 'fmin must be non-negative')
-        if fmax is not None and fmax <= fmin:
+        params = parse_query_params(request.args, MEL_SCALE_PARAMS)
+        if params['fmax'] is not None and params['fmax'] <= params['fmin']:
             return create_error_response(400, 'fmax must be greater than fmin')
         
         # Get mel scale data
-        mel_data = ColormapService.get_mel_scale_data(sample_rate, n_mels, fmin, fmax)
+        mel_json = get_mel_scale_json(
+            params['sample_rate'], params['n_mels'], params['fmin'], params['fmax']
+        )
         
-        return jsonify(mel_data)
+        return Response(mel_json, mimetype='application/json')
         
     except ValueError as e:
-        return create_error_response(400, f"Invalid parameter: {str(e)}")
+        return create_error_response(400, str(e))
     except Exception as e:
         return create_error_response(500, f"Failed to get mel scale: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Query parameter validation for AudioMoth Spectrogram Viewer
+Declarative per-endpoint parameter specs parsed in a single pass
+"""
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+
+@dataclass(frozen=True)
+class QueryParam:
+    """Specification of a single query string parameter"""
+    name: str
+    type: Callable[[str], Any] = str
+    default: Any = None
+    gt: Optional[float] = None  # exclusive lower bound
+    ge: Optional[float] = None  # inclusive lower bound
+    le: Optional[float] = None  # inclusive upper bound
+
+    def bounds_message(self) -> str:
+        """Describe the allowed range for error messages"""
+        parts = []
+        if self.gt is not None:
+            parts.append(f"greater than {self.gt}")
+        if self.ge is not None:
+            parts.append(f"at least {self.ge}")
+        if self.le is not None:
+            parts.append(f"at most {self.le}")
+        return f"{self.name} must be {' and '.join(parts)}"
+
+
+def parse_query_params(args: Mapping[str, str], params: Sequence[QueryParam]) -> Dict[str, Any]:
+    """Convert and range-check query args against params
+
+    Missing or empty values take the parameter default. Raises ValueError
+    with a client-facing message on the first invalid parameter.
+    """
+    values = {}
+    for param in params:
+        raw = args.get(param.name)
+        if raw is None or raw == '':
+            values[param.name] = param.default
+            continue
+
+        try:
+            value = param.type(raw)
+        except ValueError:
+            raise ValueError(f"Invalid {param.name} parameter")
+
+        if ((param.gt is not None and value <= param.gt) or
+                (param.ge is not None and value < param.ge) or
+                (param.le is not None and value > param.le)):
+            raise ValueError(param.bounds_message())
+
+        values[param.name] = value
+
+    return values
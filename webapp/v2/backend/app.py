@@ -5,10 +5,12 @@ Main Flask application setup following the modern architecture specification
 """
 
 import argparse
+import importlib
 import os
 import sys
 from pathlib import Path
 
+import PIL
 from flask import Flask, render_template
 
 # Add parent directories to path for imports
@@ -16,12 +18,23 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 sys.path.append(str(Path(__file__).parent))
 
 from config import load_config, setup_cli
-from database import init_database
-from api.files import files_bp
-from api.spectrograms import spectrograms_bp
-from api.audio import audio_bp
-from api.indices import indices_bp
-from api.poi import poi_bp
+from database import init_database, remove_db_session
+
+# (module, attribute) of each blueprint, imported when an app is created
+# so importing this module stays cheap
+BLUEPRINTS = (
+    ('api.files', 'files_bp'),
+    ('api.spectrograms', 'spectrograms_bp'),
+    ('api.audio', 'audio_bp'),
+    ('api.indices', 'indices_bp'),
+    ('api.poi', 'poi_bp'),
+)
+
+
+def register_blueprints(app: Flask) -> None:
+    """Import and register every blueprint listed in BLUEPRINTS"""
+    for module_name, attr in BLUEPRINTS:
+        app.register_blueprint(getattr(importlib.import_module(module_name), attr))
 
 
 def create_app(config_path: str) -> Flask:
@@ -39,6 +52,9 @@ def create_app(config_path: str) -> Flask:
     # Handle paths with spaces and expand home directory
     db_path = os.path.expanduser(db_path.replace('\\ ', ' '))
     
+    # Pillow-SIMD builds carry a .postN version suffix
+    print(f"Pillow {PIL.__version__}{' (SIMD build)' if '.post' in PIL.__version__ else ''}")
+    
     print(f"Initializing database at: {db_path}")
     
     # Check if database file exists
@@ -46,17 +62,20 @@ def create_app(config_path: str) -> Flask:
         print(f"WARNING: Database file not found at {db_path}")
         print("Creating empty database...")
     
-    init_database(db_path)
+    init_database(
+        db_path,
+        pool_size=config.get('database_pool_size', 5),
+        max_overflow=config.get('database_max_overflow', 10)
+    )
     
     # Store config in app for services to access
     app.config['DATABASE_PATH'] = db_path
     
+    # Release the request-scoped SQLAlchemy session
+    app.teardown_appcontext(remove_db_session)
+    
     # Register blueprints
-    app.register_blueprint(files_bp)
-    app.register_blueprint(spectrograms_bp)
-    app.register_blueprint(audio_bp)
-    app.register_blueprint(indices_bp)
-    app.register_blueprint(poi_bp)
+    register_blueprints(app)
     
     # Main route
     @app.route('/')
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+Colormap Baking Utility
+Pre-sample the viewer's colormaps into data/colormaps.npz so the server
+can serve them without importing matplotlib
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent))
+
+from services.colormap_service import BAKED_COLORMAPS_PATH, ColormapService, sample_colormap
+
+
+def main():
+    luts = {}
+    for name in ColormapService.get_available_colormaps():
+        if name in ['gray', 'grayscale']:
+            continue  # grayscale is rendered without a LUT
+        luts[name] = sample_colormap(name)
+    
+    BAKED_COLORMAPS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    np.savez_compressed(BAKED_COLORMAPS_PATH, **luts)
+    print(f"Baked {len(luts)} colormaps to {BAKED_COLORMAPS_PATH}")
+
+
+if __name__ == '__main__':
+    main()
@@ -4,24 +4,92 @@ Configuration management for AudioMoth Spectrogram Viewer
 """
 
 import argparse
+import json
+import re
 import sys
 import os
+import tempfile
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 # Reach repo root so config_utils is importable
 sys.path.insert(0, str(Path(__file__).resolve().parents[3]))
+# YAML parsing (includes, env expansion) happens inside loaden, which calls
+# yaml.safe_load itself; the YAML loader class cannot be chosen from here
 from config_utils import load_config as _load_config_base
 
+CONFIG_CACHE_SUFFIX = '.cache.json'
+
+# Configs using these depend on other files or the environment, so a cached
+# copy could go stale without the YAML file itself changing
+_UNCACHEABLE_MARKERS = ('loaden_include', 'loaden_env', '${')
+_ENV_SECTION = re.compile(r'^env\s*:', re.MULTILINE)
+
+
+def _config_cache_stamp(config_path: str) -> Dict[str, Any]:
+    """Identify the YAML source a cached config was parsed from"""
+    # cwd matters because config_utils resolves relative *_path values
+    return {'__source_mtime__': os.stat(config_path).st_mtime_ns, '__cwd__': os.getcwd()}
+
+
+def _read_config_cache(config_path: str, stamp: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Return the cached parsed config if it matches stamp, else None"""
+    try:
+        with open(config_path + CONFIG_CACHE_SUFFIX, encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    
+    if not isinstance(cached, dict) or any(cached.get(key) != value for key, value in stamp.items()):
+        return None
+    return cached.get('config')
+
+
+def _write_config_cache(config_path: str, stamp: Dict[str, Any], config: Dict[str, Any]) -> None:
+    """Atomically write the parsed config next to the YAML file (best effort)"""
+    try:
+        with open(config_path, encoding='utf-8') as f:
+            source = f.read()
+    except OSError:
+        return
+    
+    if any(marker in source for marker in _UNCACHEABLE_MARKERS) or _ENV_SECTION.search(source):
+        return
+    
+    try:
+        payload = json.dumps({**stamp, 'config': config})
+        # Skip configs JSON cannot reproduce exactly (dates, non-string keys)
+        if json.loads(payload)['config'] != config:
+            return
+        
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(config_path)), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(payload)
+            os.replace(tmp_path, config_path + CONFIG_CACHE_SUFFIX)
+        except OSError:
+            os.unlink(tmp_path)
+            raise
+    except (OSError, TypeError, ValueError):
+        pass
+
 
 def load_config(config_path: str) -> Dict[str, Any]:
-    """Load configuration from YAML file."""
+    """Load configuration from YAML file, reusing a JSON sidecar of the parsed result when current."""
     try:
-        return _load_config_base(config_path)
+        stamp = _config_cache_stamp(config_path)
+        cached = _read_config_cache(config_path, stamp)
+        if cached is not None:
+            return cached
+        
+        config = _load_config_base(config_path)
     except FileNotFoundError:
         raise FileNotFoundError(f"Configuration file not found: {config_path}")
     except Exception as e:
         raise ValueError(f"Invalid configuration: {e}")
+    
+    _write_config_cache(config_path, stamp, config)
+    return config
 
 
 def setup_cli() -> argparse.Namespace:
@@ -5,10 +5,11 @@ Using SQLAlchemy 2.x with modern patterns
 """
 
 import sqlite3
-from typing import Optional
-from sqlalchemy import create_engine, MetaData
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
-from sqlalchemy.pool import StaticPool
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from sqlalchemy import create_engine, event, MetaData
+from sqlalchemy.orm import DeclarativeBase, scoped_session, sessionmaker
+from sqlalchemy.pool import QueuePool
 
 
 class Base(DeclarativeBase):
@@ -21,8 +22,30 @@ engine = None
 SessionLocal = None
 metadata = MetaData()
 
+# Per-connection tuning for the read-heavy web workload
+SQLITE_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-65536",
+    "PRAGMA temp_store=MEMORY",
+)
 
-def init_database(db_path: str) -> None:
+# journal_mode=WAL persists in the database file, so it only needs setting once
+_wal_enabled = False
+
+# Indexes the web endpoints depend on: name -> (table, leading columns or expressions)
+REQUIRED_INDEXES = {
+    'idx_recording_datetime': ('audio_files', ('recording_datetime',)),
+    # Matches func.date(AudioFile.recording_datetime) filters in FileService
+    'idx_recording_date': ('audio_files', ('date(recording_datetime)',)),
+    'idx_weather_dt': ('weather_data', ('datetime',)),
+    'idx_points_of_interest_goal': ('points_of_interest', ('goal_id',)),
+    'idx_poi_spans_poi': ('poi_spans', ('poi_id',)),
+    'idx_core_file_name_chunk': ('acoustic_indices_core', ('file_id', 'index_name', 'chunk_index')),
+}
+
+
+def init_database(db_path: str, pool_size: int = 5, max_overflow: int = 10) -> None:
     """Initialize database connection with SQLAlchemy"""
     global engine, SessionLocal
     
@@ -30,15 +53,20 @@ def init_database(db_path: str) -> None:
     database_url = f"sqlite:///{db_path}"
     print(f"Database URL: {database_url}")
     
+    # A pool of connections lets WAL readers run concurrently under the threaded server
     engine = create_engine(
         database_url,
-        poolclass=StaticPool,
+        poolclass=QueuePool,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
         pool_pre_ping=True,
+        connect_args={'check_same_thread': False, 'timeout': 30},
         echo=False  # Set to True for SQL debugging
     )
+    event.listen(engine, 'connect', _on_connect)
     
-    # Create session factory
-    SessionLocal = sessionmaker(bind=engine)
+    # Create session registry: one session per thread (i.e. per request), removed on teardown
+    SessionLocal = scoped_session(sessionmaker(bind=engine, expire_on_commit=False))
     
     # Test the connection
     try:
@@ -51,35 +79,143 @@ def init_database(db_path: str) -> None:
         print(f"Database connection failed: {e}")
         raise
     
+    ensure_indexes()
+    warm_pool(pool_size)
+    
     # Create tables if they don't exist (but don't override existing ones)
     # Base.metadata.create_all(bind=engine)
 
 
+def configure_sqlite_connection(dbapi_conn) -> None:
+    """Apply WAL (once per process) and SQLITE_PRAGMAS to a new sqlite3 connection"""
+    global _wal_enabled
+    
+    cursor = dbapi_conn.cursor()
+    try:
+        if not _wal_enabled:
+            try:
+                cursor.execute("PRAGMA journal_mode=WAL")
+                _wal_enabled = True
+            except sqlite3.Error as e:
+                # Read-only databases keep their existing journal mode
+                print(f"Could not enable WAL journal mode: {e}")
+        for pragma in SQLITE_PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def _on_connect(dbapi_conn, connection_record) -> None:
+    """SQLAlchemy connect hook: tune each new pooled connection"""
+    configure_sqlite_connection(dbapi_conn)
+
+
+def _has_covering_index(conn, table: str, columns: tuple, name: str) -> bool:
+    """Check whether table already has index name, or an index starting with the given columns"""
+    for index_row in conn.exec_driver_sql(f"PRAGMA index_list({table})").fetchall():
+        index_name = index_row[1]
+        if index_name == name:
+            return True
+        # Expression index columns are reported as None, so they only match by name
+        index_columns = tuple(
+            info[2] for info in conn.exec_driver_sql(f"PRAGMA index_info('{index_name}')").fetchall()
+        )
+        if index_columns[:len(columns)] == columns:
+            return True
+    return False
+
+
+def ensure_indexes() -> None:
+    """Create any missing indexes from REQUIRED_INDEXES (startup migration)"""
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    created = False
+    for index_name, (table, columns) in REQUIRED_INDEXES.items():
+        try:
+            with engine.begin() as conn:
+                if _has_covering_index(conn, table, columns, index_name):
+                    continue
+                conn.exec_driver_sql(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON {table}({', '.join(columns)})"
+                )
+                print(f"Created index {index_name} on {table}({', '.join(columns)})")
+                created = True
+        except Exception as e:
+            # Read-only or partial databases still serve requests, just slower
+            print(f"Could not ensure index {index_name}: {e}")
+    
+    if created:
+        # Refresh planner statistics so the new indexes are actually chosen
+        try:
+            with engine.begin() as conn:
+                conn.exec_driver_sql("ANALYZE")
+        except Exception as e:
+            print(f"Could not analyze database: {e}")
+
+
+def warm_pool(size: int) -> None:
+    """Open size pooled connections up front so first requests skip connect and PRAGMA setup"""
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    connections = []
+    try:
+        # Hold them all at once so the pool has to open distinct connections
+        for _ in range(size):
+            conn = engine.connect()
+            connections.append(conn)
+            conn.exec_driver_sql("SELECT 1")
+    except Exception as e:
+        print(f"Could not warm connection pool: {e}")
+    finally:
+        for conn in connections:
+            conn.close()
+
+
+def get_pool_size() -> int:
+    """Number of persistent pooled connections (overflow connections not counted)"""
+    if engine is None:
+        raise RuntimeError("Database not initialized. Call init_database() first.")
+    
+    return engine.pool.size()
+
+
 def get_db_session():
-    """Get a database session - use as context manager"""
+    """Get the current request's database session (closed by remove_db_session)"""
     if SessionLocal is None:
         raise RuntimeError("Database not initialized. Call init_database() first.")
     
     return SessionLocal()
 
 
-def get_raw_connection():
-    """Get raw SQLite connection for legacy compatibility"""
+def remove_db_session(exception: Optional[BaseException] = None) -> None:
+    """Close and discard the current request's session (app teardown hook)"""
+    if SessionLocal is not None:
+        SessionLocal.remove()
+
+
+@contextmanager
+def get_raw_connection() -> Iterator:
+    """Check out a raw SQLite connection from the pool, returning it on exit"""
     if engine is None:
         raise RuntimeError("Database not initialized. Call init_database() first.")
     
-    # Get raw connection with Row factory for named column access
     raw_conn = engine.raw_connection()
-    raw_conn.row_factory = sqlite3.Row
-    return raw_conn
+    try:
+        yield raw_conn
+    finally:
+        raw_conn.close()  # returns the connection to the pool
 
 
 def execute_raw_query(query: str, params: tuple = ()) -> list:
-    """Execute raw SQL query and return results"""
-    conn = get_raw_connection()
-    try:
+    """Execute raw SQL query and return sqlite3.Row results (name or index access)"""
+    with get_raw_connection() as conn:
         cursor = conn.cursor()
-        cursor.execute(query, params)
-        return cursor.fetchall()
-    finally:
-        conn.close()
\ No newline at end of file
+        try:
+            # Row factory on the cursor only, so pooled connections stay untouched
+            cursor.row_factory = sqlite3.Row
+            cursor.execute(query, params)
+            return cursor.fetchall()
+        finally:
+            cursor.close()
\ No newline at end of file
@@ -12,6 +12,11 @@ from sqlalchemy.orm import relationship
 from database import Base
 
 
+def _round1(value: Optional[float]) -> Optional[float]:
+    """Round to one decimal place, passing None through"""
+    return None if value is None else round(value, 1)
+
+
 class AudioFile(Base):
     """AudioFile model matching existing database schema"""
     __tablename__ = 'audio_files'
@@ -66,11 +71,11 @@ class WeatherData(Base):
         return {
             'id': self.id,
             'datetime': self.datetime.isoformat() if self.datetime else None,
-            'temperature': round(self.temperature_2m, 1) if self.temperature_2m is not None else None,
-            'humidity': round(self.relative_humidity_2m, 1) if self.relative_humidity_2m is not None else None,
-            'precipitation': round(self.precipitation, 1) if self.precipitation is not None else None,
-            'wind_speed': round(self.wind_speed_10m, 1) if self.wind_speed_10m is not None else None,
+            'temperature': _round1(self.temperature_2m),
+            'humidity': _round1(self.relative_humidity_2m),
+            'precipitation': _round1(self.precipitation),
+            'wind_speed': _round1(self.wind_speed_10m),
             'weather_code': self.weather_code,
-            'cloud_cover': round(self.cloud_cover, 1) if self.cloud_cover is not None else None,
-            'pressure': round(self.pressure_msl, 1) if self.pressure_msl is not None else None
+            'cloud_cover': _round1(self.cloud_cover),
+            'pressure': _round1(self.pressure_msl)
         }
\ No newline at end of file
@@ -5,49 +5,66 @@ Handles colormap generation and caching
 """
 
 from typing import Optional, List, Dict, Any
+from pathlib import Path
 import numpy as np
-import matplotlib.pyplot as plt
 from functools import lru_cache
 
+# Pre-sampled LUTs for the advertised colormaps, written by bake_colormaps.py
+BAKED_COLORMAPS_PATH = Path(__file__).resolve().parent.parent / 'data' / 'colormaps.npz'
+
+
+def sample_colormap(colormap_name: str) -> np.ndarray:
+    """Sample a matplotlib colormap as a (256, 3) uint8 RGB array (KeyError if unknown)"""
+    # Import lazily: matplotlib is slow to load and only needed for unbaked names
+    from matplotlib import colormaps
+    
+    cmap = colormaps[colormap_name]
+    # Sample 256 colors from the colormap in one call, dropping alpha; i / 255.0 gives
+    # the same points as sampling each index (linspace differs in the last bit)
+    return (cmap(np.arange(256) / 255.0)[:, :3] * 255).astype(np.uint8)
+
+
+@lru_cache(maxsize=1)
+def load_baked_colormaps() -> Dict[str, np.ndarray]:
+    """Load the baked colormap LUTs once ({} if the file is missing or unreadable)
+    
+    Each LUT is normalized to a read-only contiguous (256, 3) uint8 array here,
+    so requests index it directly; malformed entries are skipped and resampled.
+    """
+    try:
+        with np.load(BAKED_COLORMAPS_PATH) as data:
+            luts = {name: np.ascontiguousarray(data[name], dtype=np.uint8) for name in data.files}
+    except (OSError, ValueError):
+        return {}
+    
+    luts = {name: lut for name, lut in luts.items() if lut.shape == (256, 3)}
+    for lut in luts.values():
+        lut.setflags(write=False)
+    return luts
+
 
 class ColormapService:
     """Service for colormap operations with caching"""
     
-    # Cache for colormap data to avoid repeated matplotlib imports
-    _colormap_cache: Dict[str, List[List[int]]] = {}
-    
     @staticmethod
     @lru_cache(maxsize=32)
-    def get_colormap(colormap_name: str) -> Optional[List[List[int]]]:
-        """Get matplotlib colormap as RGB array with caching"""
-        # Check cache first
-        if colormap_name in ColormapService._colormap_cache:
-            return ColormapService._colormap_cache[colormap_name]
-        
+    def get_colormap(colormap_name: str) -> Optional[np.ndarray]:
+        """Get matplotlib colormap as a read-only (256, 3) uint8 RGB array with caching"""
         # Handle grayscale special case
         if colormap_name in ['gray', 'grayscale']:
             return None
         
-        try:
-            # Get the colormap from matplotlib
-            cmap = plt.get_cmap(colormap_name)
-            
-            # Sample 256 colors from the colormap
-            colors = []
-            for i in range(256):
-                rgba = cmap(i / 255.0)
-                # Convert to RGB (0-255)
-                rgb = [int(rgba[0] * 255), int(rgba[1] * 255), int(rgba[2] * 255)]
-                colors.append(rgb)
-            
-            # Cache the result
-            ColormapService._colormap_cache[colormap_name] = colors
-            
-            return colors
-            
-        except (ValueError, AttributeError):
-            # Invalid colormap name
-            return None
+        colors = load_baked_colormaps().get(colormap_name)
+        if colors is None:
+            try:
+                colors = sample_colormap(colormap_name)
+            except (KeyError, ValueError, AttributeError):
+                # Invalid colormap name
+                return None
+        
+        # Shared between callers, so guard against in-place edits
+        colors.setflags(write=False)
+        return colors
     
     @staticmethod
     def get_available_colormaps() -> List[str]:
@@ -61,9 +78,12 @@ class ColormapService:
     
     @staticmethod
     def clear_cache() -> None:
-        """Clear colormap cache"""
-        ColormapService._colormap_cache.clear()
+        """Clear colormap cache, including the gamma+colormap tables built from it"""
+        # Imported here: spectrogram_service imports this module
+        from services.spectrogram_service import SpectrogramService
+        
         ColormapService.get_colormap.cache_clear()
+        SpectrogramService.get_fused_lut.cache_clear()
     
     @staticmethod
     def get_mel_scale_data(
@@ -79,26 +99,25 @@ class ColormapService:
         def hz_to_mel(hz):
             return 2595 * np.log10(1 + hz / 700)
         
-        def mel_to_hz(mel):
-            return 700 * (10**(mel / 2595) - 1)
-        
         # Create mel scale points
         mel_min = hz_to_mel(fmin)
         mel_max = hz_to_mel(fmax)
         mel_points = np.linspace(mel_min, mel_max, n_mels + 1)
         
-        # Convert back to Hz
-        freq_points = [mel_to_hz(mel) for mel in mel_points]
+        # Convert back to Hz for all points at once
+        freq_points = 700.0 * (np.power(10.0, mel_points / 2595.0) - 1.0)
+        hz_rounded = np.round(freq_points, 1).tolist()
+        khz_rounded = np.round(freq_points / 1000.0, 2).tolist()
         
-        # Create mapping for pixel positions
-        scale_data = []
-        for i, freq in enumerate(freq_points):
-            pixel_y = i  # Y position from bottom of spectrogram
-            scale_data.append({
+        # Create mapping for pixel positions (Y position from bottom of spectrogram)
+        scale_data = [
+            {
                 'pixel_y': pixel_y,
-                'frequency_hz': round(freq, 1),
-                'frequency_khz': round(freq / 1000, 2)
-            })
+                'frequency_hz': freq_hz,
+                'frequency_khz': freq_khz
+            }
+            for pixel_y, (freq_hz, freq_khz) in enumerate(zip(hz_rounded, khz_rounded))
+        ]
         
         return {
             'scale_data': scale_data,
@@ -4,70 +4,116 @@ File service for AudioMoth Spectrogram Viewer
 Handles all file-related business logic
 """
 
-from typing import List, Optional, Dict, Any
-from datetime import datetime, date
-from sqlalchemy import func, and_, or_
+import logging
+from typing import List, Optional, Dict, Any, Tuple
+from datetime import datetime, date, time, timedelta
+from sqlalchemy import func, and_, or_, select, String
 
 from database import get_db_session
 from models.audio_file import AudioFile, WeatherData
+from services.ttl_cache import clear_all_ttl_caches, ttl_cache
+
+logger = logging.getLogger(__name__)
+
+
+def _normalize_time(time_str: str) -> str:
+    """Add seconds to an HH:MM time string (HH:MM:SS passes through unchanged)"""
+    return f"{time_str}:00" if time_str.count(':') == 1 else time_str
+
+
+def recording_datetime_range(date_str: str, time_str: str) -> Tuple[str, str]:
+    """Return half-open [start, end) ISO bounds covering one second of recording_datetime
+    
+    Comparing the raw column against these bounds lets SQLite use the
+    recording_datetime index, unlike wrapping it in DATE()/TIME().
+    """
+    try:
+        start = datetime.fromisoformat(f"{date_str}T{_normalize_time(time_str)}")
+    except ValueError:
+        raise ValueError(f"Invalid date/time format: {date_str} {time_str}")
+    end = start + timedelta(seconds=1)
+    # Database stores datetimes with a T separator (e.g. 2025-06-20T00:00:00)
+    return start.isoformat(), end.isoformat()
+
+
+# Columns serialized by AudioFile.to_dict, selected without building ORM objects
+AUDIO_FILE_COLUMNS = (
+    AudioFile.id, AudioFile.filename, AudioFile.filepath, AudioFile.recording_datetime,
+    AudioFile.duration_seconds, AudioFile.audiomoth_id, AudioFile.weather_id,
+    AudioFile.processing_status,
+)
+
+
+def audio_file_row_to_dict(row) -> Dict[str, Any]:
+    """Serialize a mappings() row of AUDIO_FILE_COLUMNS the same way as AudioFile.to_dict"""
+    recorded = row['recording_datetime']
+    return {
+        'id': row['id'],
+        'filename': row['filename'],
+        'filepath': row['filepath'],
+        'recording_datetime': recorded.isoformat() if recorded else None,
+        'date': recorded.date().isoformat() if recorded else None,
+        'time': recorded.strftime('%H:%M') if recorded else None,
+        'duration_seconds': row['duration_seconds'],
+        'audiomoth_id': row['audiomoth_id'],
+        'weather_id': row['weather_id'],
+        'processing_status': row['processing_status']
+    }
 
 
 class FileService:
     """Service for file operations and queries"""
     
     @staticmethod
+    @ttl_cache(ttl_seconds=60)
     def get_available_dates() -> List[str]:
         """Return list of dates that have audio files (YYYY-MM-DD format)"""
-        with get_db_session() as session:
-            # Get distinct dates from audio files
-            dates = session.query(
-                func.date(AudioFile.recording_datetime).label('date')
-            ).distinct().order_by('date').all()
-            
-            # Convert date objects to string format
-            result = []
-            for d in dates:
-                if hasattr(d.date, 'isoformat'):
-                    result.append(d.date.isoformat())
-                else:
-                    # Handle string dates from SQLite
-                    result.append(str(d.date))
-            
-            return result
+        session = get_db_session()
+        # SQLite's date() already yields YYYY-MM-DD; typing it as String skips
+        # SQLAlchemy's Date parsing, and the expression matches idx_recording_date
+        day = func.date(AudioFile.recording_datetime, type_=String).label('date')
+        stmt = select(day).distinct().order_by(day)
+        
+        return list(session.execute(stmt).scalars())
+    
+    @staticmethod
+    def invalidate_cache() -> None:
+        """Drop cached lookups, e.g. after the ingestion pipeline adds files or weather
+        
+        Clears every ttl_cache, including spectrogram paths and available indices.
+        """
+        clear_all_ttl_caches()
     
     @staticmethod
     def get_files_for_date(date_str: str) -> List[Dict[str, Any]]:
         """Return all files for a specific date with time and metadata"""
         try:
-            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+            target_date = date.fromisoformat(date_str)
         except ValueError:
             raise ValueError(f"Invalid date format: {date_str}. Expected YYYY-MM-DD")
         
-        with get_db_session() as session:
-            files = session.query(AudioFile).filter(
-                func.date(AudioFile.recording_datetime) == target_date
-            ).order_by(AudioFile.recording_datetime).all()
-            
-            return [file.to_dict() for file in files]
+        session = get_db_session()
+        stmt = select(*AUDIO_FILE_COLUMNS).where(
+            func.date(AudioFile.recording_datetime) == target_date
+        ).order_by(AudioFile.recording_datetime)
+        
+        return [audio_file_row_to_dict(row) for row in session.execute(stmt).mappings()]
     
     @staticmethod
+    @ttl_cache(ttl_seconds=300, maxsize=4096, cache_none=False)
     def get_file_by_datetime(date_str: str, time_str: str) -> Optional[Dict[str, Any]]:
         """Get specific file by date and time"""
         # Use raw SQL like the original audio_database.py
         from database import execute_raw_query
         
-        # Add seconds if not provided
-        if len(time_str.split(':')) == 2:
-            time_str = f"{time_str}:00"
-        
         query = """
             SELECT * FROM audio_files 
-            WHERE DATE(recording_datetime) = ? 
-            AND TIME(recording_datetime) = ?
+            WHERE recording_datetime >= ? 
+            AND recording_datetime < ?
             LIMIT 1
         """
         
-        results = execute_raw_query(query, (date_str, time_str))
+        results = execute_raw_query(query, recording_datetime_range(date_str, time_str))
         
         if results:
             row = results[0]
@@ -86,57 +132,63 @@ class FileService:
         return None
     
     @staticmethod
+    @ttl_cache(ttl_seconds=300, maxsize=4096, cache_none=False)
     def get_weather_for_datetime(date_str: str, time_str: str) -> Optional[Dict[str, Any]]:
         """Get weather data for specific recording time"""
         try:
             # Parse date and time - add seconds if not provided
-            if len(time_str.split(':')) == 2:
-                time_str = f"{time_str}:00"
-            target_datetime = datetime.strptime(f"{date_str} {time_str}", '%Y-%m-%d %H:%M:%S')
+            target_datetime = datetime.fromisoformat(f"{date_str}T{_normalize_time(time_str)}")
         except ValueError:
             raise ValueError(f"Invalid date/time format: {date_str} {time_str}")
         
-        with get_db_session() as session:
-            # First try to get weather data from audio file's weather_id
-            audio_file = session.query(AudioFile).filter(
-                AudioFile.recording_datetime == target_datetime
-            ).first()
-            
-            if audio_file and audio_file.weather_id:
-                weather = session.query(WeatherData).filter(
-                    WeatherData.id == audio_file.weather_id
-                ).first()
-                if weather:
-                    return weather.to_dict()
-            
-            # Fallback: find closest weather data by datetime
+        session = get_db_session()
+        # First try to get weather data from audio file's weather_id
+        audio_file = session.query(AudioFile).filter(
+            AudioFile.recording_datetime == target_datetime
+        ).first()
+        
+        if audio_file and audio_file.weather_id:
             weather = session.query(WeatherData).filter(
-                WeatherData.datetime <= target_datetime
-            ).order_by(
-                func.abs(func.julianday(WeatherData.datetime) - func.julianday(target_datetime))
+                WeatherData.id == audio_file.weather_id
             ).first()
-            
-            return weather.to_dict() if weather else None
+            if weather:
+                return weather.to_dict()
+        
+        # Fallback: closest weather reading on either side, via two index seeks
+        before = session.query(WeatherData).filter(
+            WeatherData.datetime <= target_datetime
+        ).order_by(WeatherData.datetime.desc()).first()
+        after = session.query(WeatherData).filter(
+            WeatherData.datetime > target_datetime
+        ).order_by(WeatherData.datetime.asc()).first()
+        
+        candidates = [weather for weather in (before, after) if weather is not None]
+        if not candidates:
+            return None
+        
+        # Ties go to the earlier reading
+        weather = min(candidates, key=lambda w: abs(w.datetime - target_datetime))
+        return weather.to_dict()
     
     @staticmethod
     def get_file_by_filename(filename: str) -> Optional[Dict[str, Any]]:
         """Get file information by filename for audio serving"""
-        with get_db_session() as session:
-            file = session.query(AudioFile).filter(
-                AudioFile.filename == filename
-            ).first()
-            
-            return file.to_dict() if file else None
+        session = get_db_session()
+        file = session.query(AudioFile).filter(
+            AudioFile.filename == filename
+        ).first()
+        
+        return file.to_dict() if file else None
     
     @staticmethod
     def get_file_by_id(file_id: int) -> Optional[Dict[str, Any]]:
         """Get file information by file_id"""
-        with get_db_session() as session:
-            file = session.query(AudioFile).filter(
-                AudioFile.id == file_id
-            ).first()
-            
-            return file.to_dict() if file else None
+        session = get_db_session()
+        file = session.query(AudioFile).filter(
+            AudioFile.id == file_id
+        ).first()
+        
+        return file.to_dict() if file else None
     
     @staticmethod
     def search_files(
@@ -147,94 +199,88 @@ class FileService:
         limit: int = 100
     ) -> List[Dict[str, Any]]:
         """Search files with date and time filters"""
-        with get_db_session() as session:
-            query = session.query(AudioFile)
-            
-            # Apply date filters
-            if date_from:
-                try:
-                    from_date = datetime.strptime(date_from, '%Y-%m-%d').date()
-                    query = query.filter(func.date(AudioFile.recording_datetime) >= from_date)
-                except ValueError:
-                    raise ValueError(f"Invalid date_from format: {date_from}")
-            
-            if date_to:
-                try:
-                    to_date = datetime.strptime(date_to, '%Y-%m-%d').date()
-                    query = query.filter(func.date(AudioFile.recording_datetime) <= to_date)
-                except ValueError:
-                    raise ValueError(f"Invalid date_to format: {date_to}")
-            
-            # Apply time filters
-            if time_from:
-                try:
-                    from_time = datetime.strptime(time_from, '%H:%M').time()
-                    query = query.filter(func.time(AudioFile.recording_datetime) >= from_time)
-                except ValueError:
-                    raise ValueError(f"Invalid time_from format: {time_from}")
-            
-            if time_to:
-                try:
-                    to_time = datetime.strptime(time_to, '%H:%M').time()
-                    query = query.filter(func.time(AudioFile.recording_datetime) <= to_time)
-                except ValueError:
-                    raise ValueError(f"Invalid time_to format: {time_to}")
-            
-            # Apply limit and order
-            files = query.order_by(AudioFile.recording_datetime).limit(limit).all()
-            
-            return [file.to_dict() for file in files]
+        session = get_db_session()
+        query = select(*AUDIO_FILE_COLUMNS)
+        
+        # Apply date filters
+        if date_from:
+            try:
+                from_date = date.fromisoformat(date_from)
+                query = query.where(func.date(AudioFile.recording_datetime) >= from_date)
+            except ValueError:
+                raise ValueError(f"Invalid date_from format: {date_from}")
+        
+        if date_to:
+            try:
+                to_date = date.fromisoformat(date_to)
+                query = query.where(func.date(AudioFile.recording_datetime) <= to_date)
+            except ValueError:
+                raise ValueError(f"Invalid date_to format: {date_to}")
+        
+        # Apply time filters
+        if time_from:
+            try:
+                from_time = time.fromisoformat(time_from)
+                query = query.where(func.time(AudioFile.recording_datetime) >= from_time)
+            except ValueError:
+                raise ValueError(f"Invalid time_from format: {time_from}")
+        
+        if time_to:
+            try:
+                to_time = time.fromisoformat(time_to)
+                query = query.where(func.time(AudioFile.recording_datetime) <= to_time)
+            except ValueError:
+                raise ValueError(f"Invalid time_to format: {time_to}")
+        
+        # Apply limit and order
+        query = query.order_by(AudioFile.recording_datetime).limit(limit)
+        
+        return [audio_file_row_to_dict(row) for row in session.execute(query).mappings()]
     
     @staticmethod
     def get_navigation_file(date_str: str, time_str: str, direction: str) -> Optional[Dict[str, Any]]:
         """Get next/previous file info based on current date and time"""
         try:
             # Parse date and time - add seconds if not provided
-            if len(time_str.split(':')) == 2:
-                time_str = f"{time_str}:00"
-            current_datetime = datetime.strptime(f"{date_str}T{time_str}", '%Y-%m-%dT%H:%M:%S')
+            current_datetime = datetime.fromisoformat(f"{date_str}T{_normalize_time(time_str)}")
         except ValueError:
             raise ValueError(f"Invalid date/time format: {date_str} {time_str}")
         
         if direction not in ['next', 'prev']:
             raise ValueError("Direction must be 'next' or 'prev'")
         
-        with get_db_session() as session:
-            # Debug: print current datetime being used
-            print(f"Navigation: Looking for {direction} file after/before {current_datetime}")
-            
-            if direction == 'next':
-                # Convert datetime to ISO string for proper comparison with database
-                current_datetime_str = current_datetime.strftime('%Y-%m-%dT%H:%M:%S')
-                query = session.query(AudioFile).filter(
-                    AudioFile.recording_datetime > current_datetime_str
-                ).order_by(AudioFile.recording_datetime.asc())
-                print(f"Navigation: SQL Query: {query}")
-                print(f"Navigation: Searching for datetime > {current_datetime_str}")
-                file = query.first()
-            else:  # prev
-                current_datetime_str = current_datetime.strftime('%Y-%m-%dT%H:%M:%S')
-                file = session.query(AudioFile).filter(
-                    AudioFile.recording_datetime < current_datetime_str
-                ).order_by(AudioFile.recording_datetime.desc()).first()
-            
-            if file:
-                print(f"Navigation: Found {direction} file: {file.recording_datetime}")
-                result = file.to_dict()
-                return result
-            else:
-                print(f"Navigation: No {direction} file found")
-                return None
+        session = get_db_session()
+        logger.debug("Navigation: looking for %s file after/before %s", direction, current_datetime)
+        
+        # Compare against the ISO string: the database stores datetimes with a T
+        # separator, while a bound datetime object would be sent with a space
+        current_datetime_str = current_datetime.isoformat()
+        if direction == 'next':
+            condition = AudioFile.recording_datetime > current_datetime_str
+            order = AudioFile.recording_datetime.asc()
+        else:  # prev
+            condition = AudioFile.recording_datetime < current_datetime_str
+            order = AudioFile.recording_datetime.desc()
+        
+        # One statement for both directions, walking idx_recording_datetime
+        stmt = select(AudioFile).where(condition).order_by(order).limit(1)
+        # Lazy args: the query is only compiled to SQL when debug logging is on
+        logger.debug("Navigation: SQL query: %s", stmt)
+        file = session.execute(stmt).scalars().first()
+        
+        if file:
+            logger.debug("Navigation: found %s file: %s", direction, file.recording_datetime)
+            result = file.to_dict()
+            return result
+        else:
+            logger.debug("Navigation: no %s file found", direction)
+            return None
     
     @staticmethod
     def get_pois_for_file(date_str: str, time_str: str) -> List[Dict[str, Any]]:
         """Get POI spans for a specific file"""
         from database import execute_raw_query
         
-        # Add seconds if not provided
-        if len(time_str.split(':')) == 2:
-            time_str = f"{time_str}:00"
-        
         query = """
             SELECT 
                 p.id, p.label, p.notes, p.confidence, p.anchor_index_name, p.created_at,
@@ -243,12 +289,12 @@ class FileService:
             FROM points_of_interest p
             JOIN poi_spans ps ON p.id = ps.poi_id
             JOIN audio_files af ON ps.file_id = af.id
-            WHERE DATE(af.recording_datetime) = ? 
-            AND TIME(af.recording_datetime) = ?
+            WHERE af.recording_datetime >= ? 
+            AND af.recording_datetime < ?
             ORDER BY ps.start_time_sec, p.id
         """
         
-        results = execute_raw_query(query, (date_str, time_str))
+        results = execute_raw_query(query, recording_datetime_range(date_str, time_str))
         
         pois = []
         for row in results:
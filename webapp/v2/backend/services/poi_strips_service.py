@@ -6,23 +6,69 @@ Generates PNG images for POI visualization strips
 
 import io
 import os
+import sqlite3
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Tuple, BinaryIO
 import tempfile
 
-from PIL import Image, ImageDraw
+from PIL import Image
 import numpy as np
+from sqlalchemy.exc import SQLAlchemyError
 
+from database import get_pool_size, remove_db_session
 from services.file_service import FileService
-from services.spectrogram_service import SpectrogramService
+from services.spectrogram_service import SpectrogramService, PNG_COMPRESS_LEVEL
 from services.colormap_service import ColormapService
 
 
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def read_png_dimensions(stream: BinaryIO) -> Optional[Tuple[int, int]]:
+    """Return (width, height) from a PNG's first 24 bytes, or None if it is not a PNG"""
+    header = stream.read(24)
+    if len(header) < 24 or header[:8] != PNG_SIGNATURE or header[12:16] != b'IHDR':
+        return None
+    return struct.unpack('>II', header[16:24])
+
+
+# (low, high) confidence colors matching the spectrogram colormap ends exactly
+_POI_PALETTES = {
+    'viridis': ((68, 1, 84), (253, 231, 37)),      # purple (low) to yellow (high)
+    'plasma': ((13, 8, 135), (240, 249, 33)),      # purple (low) to bright pink/yellow (high)
+    'inferno': ((0, 0, 4), (252, 255, 164)),       # black (low) to yellow (high)
+    'grayscale': ((0, 0, 0), (255, 255, 255)),     # black (low) to white (high)
+}
+
+# Database failures (including pool checkout timeouts) must reach the route as errors
+DATABASE_ERRORS = (SQLAlchemyError, sqlite3.Error)
+
+# Shared by all requests so concurrent batches never hold more than pool_size connections
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_strips_executor() -> ThreadPoolExecutor:
+    """Return the process-wide strip rendering pool, capped by CPUs and the DB pool size"""
+    global _executor
+    
+    with _executor_lock:
+        if _executor is None:
+            max_workers = max(1, min(os.cpu_count() or 1, get_pool_size()))
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='poi-strips')
+        return _executor
+
+
 class POIStripsService:
     """Service for POI strips PNG generation"""
     
     STRIP_HEIGHT = 20
     STRIP_SPACING = 2
+    STRIP_PITCH = STRIP_HEIGHT + STRIP_SPACING  # display pixels per POI row
     
     @staticmethod
     def get_spectrogram_dimensions(date_str: str, time_str: str) -> Optional[Tuple[int, int]]:
@@ -33,46 +79,41 @@ class POIStripsService:
             if not image_file:
                 return None
             
-            # Load image and get dimensions
-            img = Image.open(image_file)
-            width, height = img.size
-            image_file.close()
+            # Read dimensions from the IHDR header, falling back to PIL for non-PNG files
+            with image_file:
+                dimensions = read_png_dimensions(image_file)
+                if dimensions is None:
+                    image_file.seek(0)
+                    dimensions = Image.open(image_file).size
             
-            return width, height
+            return dimensions
             
+        except DATABASE_ERRORS:
+            raise
         except Exception as e:
             return None
     
     @staticmethod
     def get_poi_color(confidence: float, colormap: str) -> Tuple[int, int, int]:
         """Get RGB color for POI based on confidence and colormap"""
-        # Binary high/low intensity based on confidence threshold
-        is_high_confidence = confidence > 0.7  # 70% threshold
-        
-        # Color schemes matching spectrogram colormap exactly
-        if colormap == 'viridis':
-            # Viridis: purple (low) to yellow (high)
-            return (253, 231, 37) if is_high_confidence else (68, 1, 84)
-        elif colormap == 'plasma':
-            # Plasma: purple (low) to bright pink/yellow (high)  
-            return (240, 249, 33) if is_high_confidence else (13, 8, 135)
-        elif colormap == 'inferno':
-            # Inferno: black (low) to yellow (high)
-            return (252, 255, 164) if is_high_confidence else (0, 0, 4)
-        elif colormap == 'grayscale':
-            # Grayscale: black (low) to white (high)
-            return (255, 255, 255) if is_high_confidence else (0, 0, 0)
-        else:
-            # Default to viridis colors
-            return (253, 231, 37) if is_high_confidence else (68, 1, 84)
+        # Binary high/low intensity based on confidence threshold; unknown colormaps use viridis
+        low, high = _POI_PALETTES.get(colormap, _POI_PALETTES['viridis'])
+        return high if confidence > 0.7 else low  # 70% threshold
     
     @staticmethod
     def generate_poi_strips_png(
         date_str: str, 
         time_str: str, 
-        colormap: str = 'viridis'
-    ) -> Optional[bytes]:
-        """Generate POI strips PNG image matching spectrogram dimensions"""
+        colormap: str = 'viridis',
+        compact: bool = False
+    ) -> Optional[Tuple[io.BytesIO, int]]:
+        """Generate POI strips PNG matching spectrogram dimensions
+        
+        Returns a rewound buffer and the number of strips drawn (0 for the empty
+        placeholder PNG). In compact mode each POI is a single pixel row with no
+        spacing rows; clients scale it by STRIP_PITCH (image-rendering: pixelated)
+        to restore the layout.
+        """
         try:
             # Get spectrogram dimensions
             dimensions = POIStripsService.get_spectrogram_dimensions(date_str, time_str)
@@ -85,7 +126,7 @@ class POIStripsService:
             pois = FileService.get_pois_for_file(date_str, time_str)
             if not pois:
                 # Return transparent PNG if no POIs
-                return POIStripsService._create_empty_png(spec_width)
+                return POIStripsService._create_empty_png(spec_width), 0
             
             # Get file duration
             file_info = FileService.get_file_by_datetime(date_str, time_str)
@@ -94,59 +135,93 @@ class POIStripsService:
             
             duration_seconds = file_info.get('duration_seconds', 900)  # Default 15 minutes
             
-            # Calculate total height needed
-            total_height = len(pois) * (POIStripsService.STRIP_HEIGHT + POIStripsService.STRIP_SPACING)
+            # Calculate total height needed (rows per strip include the inclusive bottom edge)
+            if compact:
+                strip_rows, stride = 1, 1
+            else:
+                strip_rows, stride = POIStripsService.STRIP_HEIGHT + 1, POIStripsService.STRIP_PITCH
+            total_height = len(pois) * stride
             if total_height == 0:
-                return POIStripsService._create_empty_png(spec_width)
-            
-            # Create image
-            img = Image.new('RGBA', (spec_width, total_height), (0, 0, 0, 0))  # Transparent background
-            draw = ImageDraw.Draw(img)
-            
-            # Draw each POI strip
-            for i, poi in enumerate(pois):
-                start_time = poi['start_time_sec']
-                end_time = poi['end_time_sec']
-                confidence = poi.get('confidence', 0.0)
-                
-                # Calculate pixel positions
-                start_x = int((start_time / duration_seconds) * spec_width)
-                end_x = int((end_time / duration_seconds) * spec_width)
-                
-                # Ensure minimum width for visibility
-                if end_x - start_x < 2:
-                    end_x = start_x + 2
-                
-                # Calculate Y position
-                y_top = i * (POIStripsService.STRIP_HEIGHT + POIStripsService.STRIP_SPACING)
-                y_bottom = y_top + POIStripsService.STRIP_HEIGHT
-                
-                # Get color based on confidence and colormap
-                color = POIStripsService.get_poi_color(confidence, colormap)
-                
-                # Draw rectangle
-                draw.rectangle(
-                    [start_x, y_top, end_x, y_bottom], 
-                    fill=color + (230,),  # Add alpha for slight transparency
-                    outline=None
-                )
+                return POIStripsService._create_empty_png(spec_width), 0
+            
+            # Column arrays computed once for all POIs instead of per-strip dict lookups
+            count = len(pois)
+            start_times = np.fromiter((poi['start_time_sec'] for poi in pois), dtype=np.float64, count=count)
+            end_times = np.fromiter((poi['end_time_sec'] for poi in pois), dtype=np.float64, count=count)
+            confidences = np.fromiter((poi.get('confidence', 0.0) for poi in pois), dtype=np.float64, count=count)
+            
+            # Calculate pixel positions (truncating like int())
+            start_x = ((start_times / duration_seconds) * spec_width).astype(np.int64)
+            end_x = ((end_times / duration_seconds) * spec_width).astype(np.int64)
+            
+            # Ensure minimum width for visibility
+            end_x = np.maximum(end_x, start_x + 2)
+            
+            # Bounds are inclusive like the rectangles drawn before; clip to the image
+            x_left = np.clip(start_x, 0, spec_width)
+            x_right = np.clip(end_x + 1, 0, spec_width)
+            
+            # Low/high confidence colors, with alpha for slight transparency
+            low, high = _POI_PALETTES.get(colormap, _POI_PALETTES['viridis'])
+            palette = np.array([low + (230,), high + (230,)], dtype=np.uint8)
+            colors = palette[(confidences > 0.7).astype(np.intp)]  # 70% threshold
+            
+            # Fill an RGBA array directly; each strip is a single slice store
+            pixels = np.zeros((total_height, spec_width, 4), dtype=np.uint8)  # Transparent background
+            for i, (left, right, color) in enumerate(zip(x_left.tolist(), x_right.tolist(), colors)):
+                y_top = i * stride
+                pixels[y_top:y_top + strip_rows, left:right] = color
+            
+            img = Image.fromarray(pixels, 'RGBA')
             
             # Save to bytes
             output = io.BytesIO()
-            img.save(output, format='PNG')
+            img.save(output, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
             output.seek(0)
             
-            return output.getvalue()
+            # Hand over the buffer itself; getvalue() would copy the whole PNG
+            return output, count
             
+        except DATABASE_ERRORS:
+            raise
         except Exception as e:
             # Return empty PNG on error
-            return POIStripsService._create_empty_png(1000)  # Default width
+            return POIStripsService._create_empty_png(1000), 0  # Default width
+    
+    @staticmethod
+    def generate_many(
+        files: List[Tuple[str, str]],
+        colormap: str = 'viridis',
+        compact: bool = False
+    ) -> List[Optional[Tuple[io.BytesIO, int]]]:
+        """Generate POI strips for several (date_str, time_str) pairs, in input order
+        
+        Files render on the shared strips executor; PNG encoding and numpy release the GIL.
+        Database errors from any file propagate to the caller.
+        """
+        def generate(date_str: str, time_str: str) -> Optional[Tuple[io.BytesIO, int]]:
+            try:
+                return POIStripsService.generate_poi_strips_png(date_str, time_str, colormap, compact)
+            finally:
+                # Each worker thread gets its own scoped session
+                remove_db_session()
+        
+        if not files:
+            return []
+        
+        return list(get_strips_executor().map(lambda file: generate(*file), files))
+    
+    @staticmethod
+    def _create_empty_png(width: int, height: int = 10) -> io.BytesIO:
+        """Create empty transparent PNG as a rewound buffer"""
+        # BytesIO shares the cached bytes until written, so this does not copy them
+        return io.BytesIO(POIStripsService._encode_empty_png(width, height))
     
     @staticmethod
-    def _create_empty_png(width: int, height: int = 10) -> bytes:
-        """Create empty transparent PNG"""
+    @lru_cache(maxsize=32)
+    def _encode_empty_png(width: int, height: int) -> bytes:
+        """Encode an empty transparent PNG once per size"""
         img = Image.new('RGBA', (width, height), (0, 0, 0, 0))
         output = io.BytesIO()
-        img.save(output, format='PNG')
-        output.seek(0)
+        img.save(output, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
         return output.getvalue()
\ No newline at end of file
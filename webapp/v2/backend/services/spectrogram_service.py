@@ -6,8 +6,9 @@ Handles spectrogram image processing and serving
 
 import io
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union, BinaryIO
+from typing import Optional, Union, BinaryIO, Tuple
 import tempfile
 
 from PIL import Image
@@ -15,6 +16,7 @@ import numpy as np
 
 from services.file_service import FileService
 from services.colormap_service import ColormapService
+from services.ttl_cache import ttl_cache
 
 # Import cross-platform path utilities if available
 try:
@@ -23,38 +25,64 @@ try:
 except ImportError:
     CROSS_PLATFORM_AVAILABLE = False
 
+# Generated PNGs are cached by clients, so trade ~10-15% larger files for much faster encoding
+PNG_COMPRESS_LEVEL = 1
+
 
 class SpectrogramService:
     """Service for spectrogram operations"""
     
     @staticmethod
     def get_spectrogram_image(date_str: str, time_str: str) -> Optional[BinaryIO]:
-        """Return spectrogram image as bytes"""
+        """Return spectrogram image as an open binary file"""
+        image_path = SpectrogramService.get_spectrogram_path(date_str, time_str)
+        if not image_path:
+            return None
+        
+        try:
+            # Return file-like object
+            return open(image_path, 'rb')
+        except FileNotFoundError:
+            # Removed since the path was cached
+            SpectrogramService.resolve_spectrogram_file.cache_clear()
+            return None
+    
+    @staticmethod
+    def get_spectrogram_path(date_str: str, time_str: str) -> Optional[str]:
+        """Resolve the spectrogram PNG path for a recording"""
         # Get file info for the datetime
         file_info = FileService.get_file_by_datetime(date_str, time_str)
         if not file_info:
             return None
         
-        # Resolve filepath using cross-platform logic if available
-        filepath = file_info['filepath']
-        filename = file_info['filename']
-        
+        return SpectrogramService.resolve_spectrogram_file(
+            file_info['filepath'],
+            file_info['filename'],
+            file_info.get('volume_prefix'),
+            file_info.get('relative_path')
+        )
+    
+    @staticmethod
+    @ttl_cache(ttl_seconds=60, maxsize=8192)
+    def resolve_spectrogram_file(
+        filepath: str,
+        filename: str,
+        volume_prefix: Optional[str] = None,
+        relative_path: Optional[str] = None
+    ) -> Optional[str]:
+        """Find the spectrogram PNG next to an audio file (cached; new files show up within a minute)"""
         # Try to resolve cross-platform path if data is available
-        if CROSS_PLATFORM_AVAILABLE:
-            volume_prefix = file_info.get('volume_prefix')
-            relative_path = file_info.get('relative_path')
-            
-            if volume_prefix and relative_path:
-                try:
-                    # Simple cross-platform resolution using stored volume prefix
-                    # This works if the webapp is running on the same volume as stored
-                    # For full cross-platform support, webapp would need config access
-                    # to determine current environment's volume prefix
-                    resolved_filepath = reconstruct_path_from_database(volume_prefix, relative_path)
-                    if os.path.exists(resolved_filepath):
-                        filepath = resolved_filepath
-                except Exception:
-                    pass  # Fall back to original filepath
+        if CROSS_PLATFORM_AVAILABLE and volume_prefix and relative_path:
+            try:
+                # Simple cross-platform resolution using stored volume prefix
+                # This works if the webapp is running on the same volume as stored
+                # For full cross-platform support, webapp would need config access
+                # to determine current environment's volume prefix
+                resolved_filepath = reconstruct_path_from_database(volume_prefix, relative_path)
+                if os.path.exists(resolved_filepath):
+                    filepath = resolved_filepath
+            except Exception:
+                pass  # Fall back to original filepath
         
         # Look for corresponding spectrogram PNG
         audio_dir = Path(filepath).parent
@@ -77,63 +105,116 @@ class SpectrogramService:
         if not image_file:
             return None
         
-        # Return file-like object
-        return open(image_file, 'rb')
+        return str(image_file)
+    
+    @staticmethod
+    def build_color_lut(colormap_data) -> np.ndarray:
+        """Return colormap_data as exactly 256 RGB rows (missing rows fall back to gray)"""
+        colors = np.asarray(colormap_data, dtype=np.uint8)
+        if colors.shape == (256, 3):
+            # Already a full table (ColormapService LUTs always are)
+            return colors
+        
+        lut = np.repeat(np.arange(256, dtype=np.uint8)[:, np.newaxis], 3, axis=1)
+        colors = colors[:256]
+        lut[:len(colors)] = colors
+        return lut
+    
+    @staticmethod
+    def build_gamma_lut(gamma: float) -> np.ndarray:
+        """Return the uint8 gamma correction table for every 8-bit input level"""
+        # Normalize to 0-1 range
+        normalized = np.arange(256, dtype=np.float32) / 255.0
+        # Apply gamma correction and convert back to 0-255 range
+        return (np.power(normalized, 1.0 / gamma) * 255).astype(np.uint8)
+    
+    @staticmethod
+    @lru_cache(maxsize=64)
+    def get_fused_lut(colormap: str, gamma: float) -> np.ndarray:
+        """Return a read-only table mapping 8-bit levels straight to output pixels
+        
+        (256, 3) RGB when the colormap is known, otherwise (256,) grayscale.
+        Callers round gamma so near-identical values share a cache entry.
+        """
+        # 8-bit input, so gamma is a 256-entry table instead of per-pixel pow
+        levels = SpectrogramService.build_gamma_lut(gamma) if gamma != 1.0 else np.arange(256, dtype=np.uint8)
+        
+        colormap_data = None
+        if colormap != 'grayscale':
+            colormap_data = ColormapService.get_colormap(colormap)
+        
+        if colormap_data is not None:
+            lut = SpectrogramService.build_color_lut(colormap_data)[levels]
+        else:
+            lut = levels
+        
+        lut.setflags(write=False)
+        return lut
     
     @staticmethod
-    def apply_colormap(image_data: bytes, colormap: str, gamma: float = 1.0) -> bytes:
-        """Apply colormap and gamma correction to grayscale image"""
+    def encode_png(img: Image.Image) -> bytes:
+        """Encode a processed image as PNG bytes"""
+        output = io.BytesIO()
+        img.save(output, format='PNG', compress_level=PNG_COMPRESS_LEVEL)
+        
+        # The only copy out of the buffer: the route needs bytes for its ETag
+        return output.getvalue()
+    
+    @staticmethod
+    def apply_colormap(image_data: bytes, colormap: str, gamma: float = 1.0) -> Tuple[bytes, str]:
+        """Apply colormap and gamma correction to grayscale image (color sources only get gamma)
+        
+        Returns the PNG bytes and the colormap actually mapped through: the requested
+        name, 'grayscale' (also for unknown names), or 'none' when the source colors
+        were kept (color sources, identity tables, or a decode error).
+        """
+        # Nothing to apply, so skip the decode/encode round trip
+        if colormap == 'grayscale' and gamma == 1.0:
+            return image_data, 'none'
+        
         try:
-            # Load image from bytes
+            # Load image from bytes (only the header is parsed here)
             img = Image.open(io.BytesIO(image_data))
             
+            # Gamma and colormap composed into one cached table of output values per level
+            rounded_gamma = round(gamma, 3)
+            lut = SpectrogramService.get_fused_lut(colormap, rounded_gamma)
+            
+            # Identity table (unknown colormap, gamma ~1.0) leaves grayscale sources unchanged
+            if img.mode == 'L' and lut.ndim == 1 and rounded_gamma == 1.0:
+                return image_data, 'none'
+            
+            if img.mode in ('RGB', 'RGBA'):
+                # Already colored (e.g. an _aci_overlay.png): recoloring through 'L' would
+                # discard its chroma, so only gamma applies, per color channel
+                if rounded_gamma == 1.0:
+                    return image_data, 'none'
+                levels = SpectrogramService.get_fused_lut('grayscale', rounded_gamma).tolist()
+                alpha = list(range(256)) if img.mode == 'RGBA' else []
+                result_img = img.point(levels * 3 + alpha)
+                return SpectrogramService.encode_png(result_img), 'none'
+            
             # Convert to grayscale if not already
             if img.mode != 'L':
                 img = img.convert('L')
             
-            # Convert to numpy array
-            img_array = np.array(img)
-            
-            # Apply gamma correction if needed
-            if gamma != 1.0:
-                # Normalize to 0-1 range
-                normalized = img_array.astype(np.float32) / 255.0
-                # Apply gamma correction
-                gamma_corrected = np.power(normalized, 1.0 / gamma)
-                # Convert back to 0-255 range
-                img_array = (gamma_corrected * 255).astype(np.uint8)
-            
-            # Apply colormap if not grayscale
-            if colormap != 'grayscale':
-                colormap_data = ColormapService.get_colormap(colormap)
-                if colormap_data:
-                    # Apply colormap
-                    colored_array = np.zeros((img_array.shape[0], img_array.shape[1], 3), dtype=np.uint8)
-                    for i in range(256):
-                        mask = img_array == i
-                        if np.any(mask):
-                            color = colormap_data[i] if i < len(colormap_data) else [i, i, i]
-                            colored_array[mask] = color
-                    
-                    # Convert back to PIL Image
-                    result_img = Image.fromarray(colored_array, 'RGB')
-                else:
-                    # Fallback to grayscale
-                    result_img = Image.fromarray(img_array, 'L')
+            if lut.ndim == 2:
+                # Colormap: the gray levels become palette indices and the fused table the
+                # palette, so no pixel is rewritten and the PNG stores 1 byte per pixel
+                result_img = img
+                result_img.putpalette(lut.tobytes())
+                applied = colormap
             else:
-                # Keep as grayscale
-                result_img = Image.fromarray(img_array, 'L')
+                # Grayscale (also the fallback for unknown colormaps) stays 'L'; point()
+                # maps through the table in Pillow's C core without a numpy round trip
+                result_img = img.point(lut.tolist())
+                applied = 'grayscale'
             
-            # Save to bytes
-            output = io.BytesIO()
-            result_img.save(output, format='PNG')
-            output.seek(0)
-            
-            return output.getvalue()
+            return SpectrogramService.encode_png(result_img), applied
             
         except Exception as e:
             # Return original image data on error
-            return image_data
+            return image_data, 'none'
     
     @staticmethod
     def get_spectrogram_with_processing(
@@ -141,8 +222,11 @@ class SpectrogramService:
         time_str: str, 
         colormap: str = 'viridis', 
         gamma: float = 1.0
-    ) -> Optional[bytes]:
-        """Get spectrogram image with colormap and gamma processing applied"""
+    ) -> Optional[Tuple[bytes, str]]:
+        """Get spectrogram image with colormap and gamma processing applied
+        
+        Returns the PNG bytes and the colormap applied, as for apply_colormap.
+        """
         # Get original image
         image_file = SpectrogramService.get_spectrogram_image(date_str, time_str)
         if not image_file:
@@ -155,10 +239,9 @@ class SpectrogramService:
             
             # Apply processing if needed
             if colormap != 'grayscale' or gamma != 1.0:
-                processed_data = SpectrogramService.apply_colormap(image_data, colormap, gamma)
-                return processed_data
+                return SpectrogramService.apply_colormap(image_data, colormap, gamma)
             
-            return image_data
+            return image_data, 'none'
             
         except Exception as e:
             if hasattr(image_file, 'close'):
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Per-process TTL memoization for AudioMoth Spectrogram Viewer
+Used for lookups that only change when the ingestion pipeline writes new data
+"""
+
+import threading
+import time
+from functools import wraps
+from typing import Any, Callable, Dict, List, Tuple
+
+# cache_clear of every ttl_cache-decorated function, for clear_all_ttl_caches()
+_cache_clears: List[Callable[[], None]] = []
+
+
+def ttl_cache(ttl_seconds: float = 60.0, maxsize: int = 128, cache_none: bool = True) -> Callable:
+    """Memoize results by call arguments for ttl_seconds
+    
+    Concurrent misses for the same arguments are coalesced: one caller runs
+    the function while the others wait for its result (single-flight).
+    The wrapped function gains a cache_clear() method for explicit invalidation,
+    and is also cleared by clear_all_ttl_caches().
+    Cached values are shared between callers and must not be mutated.
+    With cache_none=False a None result ("not found") is returned but not stored,
+    so rows ingested after a miss show up on the next call.
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: Dict[Any, Tuple[float, Any]] = {}
+        inflight: Dict[Any, threading.Lock] = {}
+        lock = threading.Lock()
+        
+        def lookup(key, now):
+            entry = cache.get(key)
+            if entry is not None and entry[0] > now:
+                return True, entry[1]
+            return False, None
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            
+            hit, value = lookup(key, time.monotonic())
+            if hit:
+                return value
+            
+            with lock:
+                key_lock = inflight.setdefault(key, threading.Lock())
+            
+            with key_lock:
+                # Another caller may have filled the entry while we waited
+                hit, value = lookup(key, time.monotonic())
+                if hit:
+                    return value
+                
+                try:
+                    value = func(*args, **kwargs)
+                    if value is None and not cache_none:
+                        return value
+                    with lock:
+                        if key not in cache and len(cache) >= maxsize:
+                            # Evict the oldest entry (dicts keep insertion order)
+                            cache.pop(next(iter(cache)), None)
+                        cache[key] = (time.monotonic() + ttl_seconds, value)
+                finally:
+                    with lock:
+                        inflight.pop(key, None)
+                return value
+        
+        def cache_clear():
+            with lock:
+                cache.clear()
+        
+        wrapper.cache_clear = cache_clear
+        _cache_clears.append(cache_clear)
+        return wrapper
+    
+    return decorator
+
+
+def clear_all_ttl_caches() -> None:
+    """Clear every ttl_cache in the process, e.g. after the database changes"""
+    for cache_clear in _cache_clears:
+        cache_clear()
@@ -12,6 +12,9 @@ export class POIStrips {
         this.pois = [];
         this.stripHeight = 20;
         this.stripSpacing = 2;
+        this.stripPitch = null;
+        this.stripsObjectUrl = null;
+        this.pendingUrl = null;
         this.tooltip = null;
         
         if (!this.container) {
@@ -116,7 +119,7 @@ export class POIStrips {
         }
     }
     
-    renderStrips() {
+    async renderStrips() {
         const state = this.stateManager.getState();
         
         if (!state.selectedDate || !state.selectedTime) {
@@ -124,8 +127,37 @@ export class POIStrips {
             return;
         }
         
+        // Set up POI strips PNG URL with colormap
+        const colormap = state.colormap || 'viridis';
+        const imageUrl = `/api/poi-strips/${state.selectedDate}/${state.selectedTime}?colormap=${colormap}&compact=1`;
+        this.pendingUrl = imageUrl;
+        
+        let response;
+        let blob;
+        try {
+            response = await fetch(imageUrl);
+            if (!response.ok) {
+                throw new Error(`HTTP ${response.status}`);
+            }
+            blob = await response.blob();
+        } catch (error) {
+            console.warn('Failed to load POI strips PNG, hiding container:', error);
+            if (this.pendingUrl === imageUrl) {
+                this.clearStrips();
+            }
+            return;
+        }
+        
+        // A newer file or colormap was selected while this one loaded
+        if (this.pendingUrl !== imageUrl) {
+            return;
+        }
+        
+        // Display height of each PNG row; absent when the server drew no strips
+        this.stripPitch = parseInt(response.headers.get('X-Strip-Pitch'), 10) || null;
+        
         // Clear existing content and recreate image element
-        this.stripsContainer.innerHTML = '';
+        this.clearStripsImage();
         this.stripsImage = document.createElement('img');
         this.stripsImage.className = 'poi-strips-image';
         this.stripsImage.style.cssText = `
@@ -133,31 +165,43 @@ export class POIStrips {
             width: 100%;
             height: auto;
             max-width: none;
-            cursor: pointer;
         `;
-        this.stripsContainer.appendChild(this.stripsImage);
         
-        // Set up POI strips PNG URL with colormap
-        const colormap = state.colormap || 'viridis';
-        const imageUrl = `/api/poi-strips/${state.selectedDate}/${state.selectedTime}?colormap=${colormap}`;
+        if (this.stripPitch) {
+            // Compact PNG has one pixel row per POI; scale each row up to a strip and
+            // mask out the spacing between strips
+            const stripHeight = this.stripPitch - this.stripSpacing;
+            const stripMask = `repeating-linear-gradient(to bottom, #000 0 ${stripHeight}px, transparent ${stripHeight}px ${this.stripPitch}px)`;
+            this.stripsImage.style.cssText += `
+                cursor: pointer;
+                image-rendering: pixelated;
+                -webkit-mask-image: ${stripMask};
+                mask-image: ${stripMask};
+            `;
+        }
+        this.stripsContainer.appendChild(this.stripsImage);
         
         // Load the POI strips image
         this.stripsImage.onload = () => {
             console.log('POI strips PNG loaded successfully');
-            this.setupImageInteractions();
+            if (this.stripPitch) {
+                this.stripsImage.style.height = `${this.stripsImage.naturalHeight * this.stripPitch}px`;
+                this.setupImageInteractions();
+            }
         };
         
         this.stripsImage.onerror = () => {
-            console.warn('Failed to load POI strips PNG, hiding container');
+            console.warn('Failed to decode POI strips PNG, hiding container');
             this.clearStrips();
         };
         
         // Set the source to trigger loading
-        this.stripsImage.src = imageUrl;
+        this.stripsObjectUrl = URL.createObjectURL(blob);
+        this.stripsImage.src = this.stripsObjectUrl;
     }
     
     setupImageInteractions() {
-        if (!this.stripsImage || !this.pois.length) {
+        if (!this.stripsImage || !this.pois.length || !this.stripPitch) {
             return;
         }
         
@@ -216,11 +260,12 @@ export class POIStrips {
     }
     
     findPOIAtPosition(timeSeconds, y, imageHeight) {
-        const stripHeight = 20; // Match server-side STRIP_HEIGHT
-        const stripSpacing = 2; // Match server-side STRIP_SPACING
+        if (!this.stripPitch) {
+            return null;
+        }
         
-        // Calculate which strip index this Y position corresponds to
-        const stripIndex = Math.floor(y / (stripHeight + stripSpacing));
+        // Calculate which strip index this Y position corresponds to (pitch from X-Strip-Pitch)
+        const stripIndex = Math.floor(y / this.stripPitch);
         
         if (stripIndex < 0 || stripIndex >= this.pois.length) {
             return null;
@@ -294,16 +339,31 @@ export class POIStrips {
         }
     }
     
-    clearStrips() {
-        this.pois = [];
+    clearStripsImage() {
         if (this.stripsContainer) {
             this.stripsContainer.innerHTML = '';
-            this.stripsContainer.style.minHeight = '10px';
         }
         if (this.stripsImage) {
+            // Detach handlers first: clearing src can fire onerror
+            this.stripsImage.onload = null;
+            this.stripsImage.onerror = null;
             this.stripsImage.src = '';
             this.stripsImage = null;
         }
+        if (this.stripsObjectUrl) {
+            URL.revokeObjectURL(this.stripsObjectUrl);
+            this.stripsObjectUrl = null;
+        }
+    }
+    
+    clearStrips() {
+        this.pois = [];
+        this.stripPitch = null;
+        this.pendingUrl = null;
+        this.clearStripsImage();
+        if (this.stripsContainer) {
+            this.stripsContainer.style.minHeight = '10px';
+        }
         this.hideTooltip();
     }
     
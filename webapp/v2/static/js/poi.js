@@ -0,0 +1,116 @@
+/**
+ * POI Page Entry Point
+ * Loads the spans of a point of interest when its span list is first expanded
+ */
+
+import { ApiService } from './services/ApiService.js';
+
+// Server-side cap on files per /api/poi-strips/batch request
+const MAX_BATCH_POI_STRIPS = 100;
+
+/**
+ * Build a deep link element for a single span
+ * @param {Object} span - Span data from /poi/api/poi/<id>/spans
+ * @returns {HTMLElement} Span element
+ */
+function createSpanElement(span) {
+    const spanElement = document.createElement('div');
+    spanElement.className = 'poi-span';
+
+    const link = document.createElement('a');
+    link.className = 'poi-link';
+    link.href = `/?file_id=${span.file_id}&time=${span.start_time_sec}`;
+
+    const fileName = document.createElement('strong');
+    fileName.textContent = span.file_name;
+
+    link.append(
+        fileName,
+        document.createElement('br'),
+        `${span.start_time_formatted} - ${span.end_time_formatted}`
+    );
+    spanElement.appendChild(link);
+
+    return spanElement;
+}
+
+/**
+ * Get the 'DATE/TIME' key of a span's recording
+ * @param {Object} span - Span data with datetime_recorded (YYYY-MM-DDTHH:MM:SS)
+ * @returns {string} File key as used by /api/poi-strips/batch
+ */
+function spanFileKey(span) {
+    return `${span.datetime_recorded.slice(0, 10)}/${span.datetime_recorded.slice(11, 16)}`;
+}
+
+/**
+ * Add each span's file POI strips, fetched in batches of distinct files
+ * @param {Array<Object>} spans - Span data
+ * @param {Array<HTMLElement>} spanElements - Rendered span elements, same order
+ */
+async function loadSpanStrips(spans, spanElements) {
+    const keys = [...new Set(spans.filter(span => span.datetime_recorded).map(spanFileKey))];
+    const urls = new Map();
+
+    for (let i = 0; i < keys.length; i += MAX_BATCH_POI_STRIPS) {
+        const files = keys.slice(i, i + MAX_BATCH_POI_STRIPS).map(key => {
+            const [date, time] = key.split('/');
+            return { date, time };
+        });
+        const strips = await ApiService.getPOIStripsBatch(files);
+        strips.forEach((blob, key) => {
+            if (blob) {
+                urls.set(key, URL.createObjectURL(blob));
+            }
+        });
+    }
+
+    spans.forEach((span, i) => {
+        const url = span.datetime_recorded && urls.get(spanFileKey(span));
+        if (url) {
+            const strips = document.createElement('img');
+            strips.className = 'poi-span-strips';
+            strips.src = url;
+            strips.alt = `POI strips for ${span.file_name}`;
+            spanElements[i].querySelector('.poi-link').appendChild(strips);
+        }
+    });
+}
+
+/**
+ * Fetch and render spans for a POI the first time its details element opens
+ * @param {HTMLDetailsElement} details - Details element with data-poi-id
+ */
+async function loadSpans(details) {
+    if (!details.open || details.dataset.loaded) {
+        return;
+    }
+
+    details.dataset.loaded = 'true';
+    const container = details.querySelector('.poi-spans');
+
+    try {
+        const response = await fetch(`/poi/api/poi/${details.dataset.poiId}/spans`);
+        const spans = await response.json();
+
+        if (!response.ok) {
+            throw new Error(spans.error || `HTTP ${response.status}`);
+        }
+
+        const spanElements = spans.map(createSpanElement);
+        container.replaceChildren(...spanElements);
+
+        // Strips are decoration; a failure leaves the span links in place
+        loadSpanStrips(spans, spanElements).catch(error => {
+            console.error(`Failed to load POI strips for POI ${details.dataset.poiId}:`, error);
+        });
+    } catch (error) {
+        console.error(`Failed to load spans for POI ${details.dataset.poiId}:`, error);
+        delete details.dataset.loaded;
+        container.textContent = 'Failed to load spans';
+    }
+}
+
+document.querySelectorAll('.poi-spans-toggle').forEach(details => {
+    details.addEventListener('toggle', () => loadSpans(details));
+});
@@ -281,4 +281,65 @@ export class ApiService {
             throw new Error(result.error || 'Failed to get RGB indices data');
         }
     }
+    
+    /**
+     * Get POI strips for several files in one request (rendered concurrently server-side)
+     * @param {Array<{date: string, time: string}>} files - Files to render (at most 100)
+     * @param {string} colormap - Colormap name (default: 'viridis')
+     * @returns {Promise<Map<string, Blob|null>>} PNG blobs (null when missing) keyed by 'DATE/TIME'
+     */
+    static async getPOIStripsBatch(files, colormap = 'viridis') {
+        const params = new URLSearchParams({
+            files: files.map(({ date, time }) => `${date}/${time}`).join(','),
+            colormap
+        });
+        const response = await this.request(`/api/poi-strips/batch?${params}`);
+        const buffer = await response.arrayBuffer();
+        const keys = (response.headers.get('X-Strip-Files') || '').split(',');
+        const lengths = (response.headers.get('X-Strip-Lengths') || '').split(',');
+        
+        // Layout: the PNGs back to back, in X-Strip-Files order
+        const strips = new Map();
+        let offset = 0;
+        keys.forEach((key, i) => {
+            const length = parseInt(lengths[i], 10) || 0;
+            strips.set(key, length ? new Blob([buffer.slice(offset, offset + length)], { type: 'image/png' }) : null);
+            offset += length;
+        });
+        
+        return strips;
+    }
+    
+    /**
+     * Get RGB-mapped indices as packed binary arrays (no raw values or ranges)
+     * @param {string} date - Date string (YYYY-MM-DD)
+     * @param {string} time - Time string (HH:MM)
+     * @param {Object} channels - RGB channel assignments {red: 'index_name', green: 'index_name', blue: 'index_name'}
+     * @returns {Promise<Object>} {chunks, indices, startTimes: Float32Array, rgb: Uint8Array (chunks x 3)}
+     */
+    static async getRGBIndicesBinary(date, time, channels = {}) {
+        const params = new URLSearchParams({ format: 'binary' });
+        
+        if (channels.red) params.append('red', channels.red);
+        if (channels.green) params.append('green', channels.green);
+        if (channels.blue) params.append('blue', channels.blue);
+        
+        const response = await this.request(`/api/indices/${date}/${time}/rgb?${params}`);
+        const buffer = await response.arrayBuffer();
+        const chunks = parseInt(response.headers.get('X-Chunks'), 10);
+        
+        // Layout: chunks little-endian float32 start times, then chunks x 3 uint8 RGB
+        const view = new DataView(buffer);
+        const startTimes = new Float32Array(chunks);
+        for (let i = 0; i < chunks; i++) {
+            startTimes[i] = view.getFloat32(i * 4, true);
+        }
+        
+        return {
+            chunks,
+            indices: (response.headers.get('X-Indices') || '').split(','),
+            startTimes,
+            rgb: new Uint8Array(buffer, chunks * 4, chunks * 3)
+        };
+    }
 }
\ No newline at end of file